@@ -10,12 +10,10 @@ See the tests at the end of this module for examples of defining a parser for co
 
 from __future__ import annotations
 
-import operator
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
-from functools import partial, reduce
-from itertools import accumulate
-from typing import Any, Iterator, List, Tuple, Type, Union
+from functools import partial
+from typing import Any, Dict, Generic, Iterator, List, Optional, Tuple, Type, Union
 
 from typing_extensions import TypeVar
 
@@ -49,20 +47,24 @@ class StringCompletion(Parser[str]):
     def parse_result(self, state: TextState) -> Result[str]:
         string_length = len(self.string)
         text = state.text[state.index : state.index + string_length]
-
-        *_, prefix = [
-            pre for pre in accumulate(self.string, initial="") if text.startswith(pre)
-        ]
-        if prefix == self.string:
+        if text == self.string:
             return state.at(state.index + string_length).success(self.string)
+
+        # Length of the common prefix of the option and the text
+        matched = 0
+        for expected, actual in zip(self.string, text):
+            if expected != actual:
+                break
+            matched += 1
+
         return (
-            state.at(state.index + len(prefix))
-            .failure(f"Only part of the string matched: '{prefix}'")
+            state.at(state.index + matched)
+            .failure(f"Only part of the string matched: '{self.string[:matched]}'")
             .map_failure(
                 partial(
                     map_autocomplete_info,
                     option=self.string,
-                    completion=self.string[len(prefix) :],
+                    completion=self.string[matched:],
                 )
             )
         )
@@ -73,14 +75,96 @@ def string_completion(string: str) -> Parser[str]:
     return StringCompletion(string)
 
 
+T = TypeVar("T")
+
+
+@dataclass
+class TrieNode(Generic[T]):
+    """A node of a prefix tree of options: the option ending at this node (if any),
+    and the child node for each possible next character."""
+
+    children: Dict[str, TrieNode[T]] = field(default_factory=dict)
+    terminal: Optional[Tuple[str, T]] = None
+
+    def terminals(self) -> Iterator[Tuple[str, T]]:
+        """All (option, value) pairs ending at or below this node."""
+        if self.terminal is not None:
+            yield self.terminal
+        for child in self.children.values():
+            yield from child.terminals()
+
+
+@dataclass
+class TrieCompletion(Parser[T]):
+    """
+    Match the longest of several options by walking a prefix tree of the options, so
+    that shared prefixes are only scanned once.
+
+    When some options are only partially matched, the completions for all of those
+    options are stored in the failure state.
+    """
+
+    options: Dict[str, T]
+
+    def __post_init__(self) -> None:
+        self.name = " | ".join(repr(option) for option in self.options)
+        # The trie always finds the longest match, so unlike an alternation of
+        # options the options don't need to be sorted longest first
+        self.position = {
+            option: position for position, option in enumerate(self.options)
+        }
+        self.root: TrieNode[T] = TrieNode()
+        for option, value in self.options.items():
+            node = self.root
+            for char in option:
+                node = node.children.setdefault(char, TrieNode())
+            node.terminal = (option, value)
+
+    def parse_result(self, state: TextState) -> Result[T]:
+        text = state.text
+        index = state.index
+        node = self.root
+        longest = node.terminal
+        while index < len(text) and text[index] in node.children:
+            node = node.children[text[index]]
+            index += 1
+            if node.terminal is not None:
+                longest = node.terminal
+
+        depth = index - state.index
+        # Only the completions being reported are ordered: longest option first, then
+        # in the given order
+        partial_options = sorted(
+            (option for option, _ in node.terminals() if len(option) > depth),
+            key=lambda option: (-len(option), self.position[option]),
+        )
+        if partial_options:
+            prefix = partial_options[0][:depth]
+            completions = tuple(option[depth:] for option in partial_options)
+            failure = (
+                state.at(index)
+                .failure(f"Only part of the string matched: '{prefix}'")
+                .map_failure(
+                    lambda info: AutocompleteInfo(
+                        index=info.index, message=self.name, completions=completions
+                    )
+                )
+            )
+            if longest is None:
+                return failure
+            # Keep the partial matches as failures alongside the successful match
+            state = failure.state.at(state.index)
+        elif longest is None:
+            return state.failure(self.name)
+
+        option, value = longest
+        return state.at(state.index + len(option)).success(value)
+
+
 def string_completion_from(*strings: str) -> Parser[str]:
     """Match one of the given strings, with information about how much of the prefix
     matched in the case of failure."""
-    sorted_strings = tuple(sorted(strings, key=len, reverse=True))
-    return reduce(
-        operator.or_,
-        [string_completion(option) for option in sorted_strings],
-    )
+    return TrieCompletion({option: option for option in strings})
 
 
 @dataclass(frozen=True, eq=True)
@@ -95,15 +179,7 @@ E = TypeVar("E", bound=Enum)
 
 def enum_completion(enum: Type[E]) -> Parser[E]:
     """Autocompletion parser from enum values."""
-    items = sorted(
-        (enum_member for enum_member in enum),
-        key=lambda e: len(str(e.value)),
-        reverse=True,
-    )
-    return reduce(
-        operator.or_,
-        [string_completion(str(item.value)).result(item) for item in items],
-    )
+    return TrieCompletion({str(item.value): item for item in enum})
 
 
 def completions(parser: Parser[Any], text: str) -> List[str]:
@@ -111,16 +187,12 @@ def completions(parser: Parser[Any], text: str) -> List[str]:
         parser.parse(text)
         return []
     except ParseError as exception:
-        expected = exception.failures
-        continuations = reduce(
-            operator.add,
-            [
-                [*(option.completions if isinstance(option, AutocompleteInfo) else [])]
-                for option in expected
-            ],
-        )
-        # Deduplicate
-        return list(dict.fromkeys(continuations))
+        # Deduplicate while keeping the order of the completions
+        continuations: Dict[str, None] = {}
+        for option in exception.failures:
+            if isinstance(option, AutocompleteInfo):
+                continuations.update(dict.fromkeys(option.completions))
+        return list(continuations)
 
 
 def test_basic_completions() -> None:
@@ -182,9 +254,17 @@ def test_query_builder_autocomplete() -> None:
     variable = string_completion_from(*variable_names) << whitespace
 
     single = seq(unary_op, variable) | variable
-    double = seq(single, binary_op, _query)
 
-    query = double | single
+    def combine(
+        left: SingleQueryType, right: Optional[Tuple[str, QueryType]]
+    ) -> QueryType:
+        if right is None:
+            return left
+        return (left, *right)
+
+    # Equivalent to `seq(single, binary_op, _query) | single`, but `single` is only
+    # parsed once rather than being parsed again when the first alternative fails
+    query = seq(single, seq(binary_op, _query).optional()).unpack(combine)
 
     # Act
     # autocomplete "not"
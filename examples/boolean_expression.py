@@ -33,9 +33,10 @@ of parser combinators.
 For the comparison operator, instead of just matching the text for each possible
 operator ("==", ">", "!=", etc. as strings), each operator is also mapped to its
 related Python operator.
-For example, `string(">").result(operator.gt)` will try to match the string ">", and if
-it does match, the result is set as the Python greater-than operator, ready to be
-directly applied to a pair of values when the boolean program is evaluated.
+All the operators are matched by a single regex, and the matched text is looked up in
+a table of Python operators: if ">" is matched, the result is set as the Python
+greater-than operator, ready to be directly applied to a pair of values when the
+boolean program is evaluated.
 The string ">" is never needed again after this point in the definition.
 
 Some parts of the grammar are defined as dataclass parsers, each of which has an
@@ -50,28 +51,45 @@ from __future__ import annotations
 
 import operator
 from dataclasses import dataclass
-from functools import reduce
+from functools import lru_cache
 from typing import Callable, Dict, Iterator, Sequence, Union
 
 from parmancer import (
     Parser,
+    Result,
+    TextState,
     forward_parser,
     gather,
-    padding,
     regex,
+    stateful_parser,
     string,
     take,
 )
 from typing_extensions import TypeAlias
 
+comparison_operators: Dict[str, Callable[[int, int], bool]] = {
+    "==": operator.eq,
+    "=": operator.eq,
+    ">=": operator.ge,
+    "≥": operator.ge,
+    ">": operator.gt,
+    "<=": operator.le,
+    "≤": operator.le,
+    "<": operator.lt,
+    "!=": operator.ne,
+    "≠": operator.ne,
+}
+
+# Each token is matched along with any surrounding whitespace by a single regex, rather
+# than by separate parsers for the whitespace either side of it.
+# Longer operators come before their prefixes, e.g. `>=` is tried before `>`
 comparison = (
-    regex("==?").result(operator.eq)
-    | regex("(>=|≥)").result(operator.ge)
-    | string(">").result(operator.gt)
-    | regex("(<=|≤)").result(operator.le)
-    | string("<").result(operator.lt)
-    | regex("(!=|≠)").result(operator.ne)
+    regex(r"\s*(==?|>=|≥|>|<=|≤|<|!=|≠)\s*", group=1)
+    .map(comparison_operators.__getitem__, "operator")
+    .set_name("comparison operator")
 )
+or_operator = regex(r"\s*\|\s*").set_name("|")
+and_operator = regex(r"\s*&\s*").set_name("&")
 
 IntValue: TypeAlias = "Union[Var, Const]"
 BoolValue: TypeAlias = "Union[Comparison, Or, And, Not]"
@@ -79,7 +97,7 @@ BoolValue: TypeAlias = "Union[Comparison, Or, And, Not]"
 
 @forward_parser
 def _and() -> "Iterator[Parser[And]]":
-    yield gather(And)
+    yield and_parser
 
 
 @forward_parser
@@ -89,22 +107,29 @@ def _bool_term() -> "Iterator[Parser[BoolValue]]":
 
 @dataclass
 class Or:
-    values: Sequence[BoolValue] = take(
-        _and.sep_by(padding >> string("|") << padding, min_count=1)
-    )
+    values: Sequence[BoolValue] = take(_and.sep_by(or_operator, min_count=1))
 
     def evaluate(self, state: Dict[str, int]) -> bool:
-        return reduce(operator.or_, (x.evaluate(state) for x in self.values))
+        return any(x.evaluate(state) for x in self.values)
 
 
-@dataclass
+@dataclass(frozen=True)
 class Var:
-    name: str = take(regex(r"[A-Za-z][A-Za-z0-9_]*"))
+    name: str
 
     def evaluate(self, state: Dict[str, int]) -> int:
         return state[self.name]
 
 
+# Variables and constants are immutable, so each distinct one is only created once and
+# then shared by every place it appears in the program.
+# Sub-parsers which are retried at the same position by different alternatives are
+# memoized, so they only run once per position
+var_parser = (
+    regex(r"[A-Za-z][A-Za-z0-9_]*").map(lru_cache(maxsize=256)(Var), "Var").memoize()
+)
+
+
 @dataclass
 class Not:
     value: BoolValue = take(string("!") >> _bool_term)
@@ -113,14 +138,33 @@ class Not:
         return not self.value.evaluate(state)
 
 
-@dataclass
+@dataclass(frozen=True)
 class Const:
-    value: int = take(regex(r"\s*(-?\d+)\s*", group=1).map(int))
+    value: int
 
     def evaluate(self, state: Dict[str, int]) -> int:
         return self.value
 
 
+const_parser = (
+    regex(r"\s*(-?\d+)\s*", group=1)
+    .map(int)
+    .map(lru_cache(maxsize=256)(Const), "Const")
+    .memoize()
+)
+
+
+@stateful_parser
+def int_value(state: TextState) -> Result[IntValue]:
+    """
+    A variable or a constant: a variable always starts with a letter and a constant
+    never does, so the next character decides which one to try.
+    """
+    if state.text[state.index : state.index + 1].isalpha():
+        return var_parser.parse_result(state)
+    return const_parser.parse_result(state)
+
+
 @dataclass
 class Comparison:
     """
@@ -129,28 +173,45 @@ class Comparison:
     / '!'? '(' multiOR ')'
     """
 
-    left: IntValue = take(gather(Var) | gather(Const))
-    operator: Callable[[int, int], bool] = take(padding >> comparison << padding)
-    right: IntValue = take(gather(Var) | gather(Const))
+    left: IntValue = take(int_value)
+    operator: Callable[[int, int], bool] = take(comparison)
+    right: IntValue = take(int_value)
 
     def evaluate(self, state: Dict[str, int]) -> bool:
         return self.operator(self.left.evaluate(state), self.right.evaluate(state))
 
 
-bool_term = gather(Comparison) | gather(Not) | string("(") >> gather(Or) << string(")")
+or_parser = gather(Or).memoize()
+comparison_parser = gather(Comparison).memoize()
+not_parser = gather(Not)
+parenthesized = string("(") >> or_parser << string(")")
+
+
+@stateful_parser
+def bool_term(state: TextState) -> Result[BoolValue]:
+    """
+    A comparison, a negation or a parenthesized expression. Only one of them can match
+    the next character, so it's used to pick one without backtracking.
+    """
+    next_char = state.text[state.index : state.index + 1]
+    if next_char == "!":
+        return not_parser.parse_result(state)
+    if next_char == "(":
+        return parenthesized.parse_result(state)
+    return comparison_parser.parse_result(state)
 
 
 @dataclass
 class And:
-    values: Sequence[BoolValue] = take(
-        bool_term.sep_by(padding >> string("&") << padding, min_count=1)
-    )
+    values: Sequence[BoolValue] = take(bool_term.sep_by(and_operator, min_count=1))
 
     def evaluate(self, state: Dict[str, int]) -> bool:
-        return reduce(operator.and_, (x.evaluate(state) for x in self.values))
+        return all(x.evaluate(state) for x in self.values)
+
 
+and_parser = gather(And).memoize()
 
-expr = gather(Or)
+expr = or_parser
 
 
 def test_demo() -> None:
@@ -7,10 +7,22 @@ The text being parsed comes from this StackOverflow post:
 https://stackoverflow.com/questions/47982949/how-to-parse-complex-text-files-using-python
 """
 
-from dataclasses import dataclass
-from typing import List
+import re
+from dataclasses import dataclass, fields
+from typing import Any, Callable, Dict, List, Type, TypeVar, cast
+
+from parmancer import (
+    Parser,
+    Result,
+    TextState,
+    gather,
+    regex,
+    stateful_parser,
+    string,
+    take,
+)
 
-from parmancer import gather, regex, string, take
+T = TypeVar("T")
 
 # Create a parser for the following text and then run it and see the results
 
@@ -85,14 +97,60 @@ class Score:
     score: int = take(integer << string("\n"))
 
 
+def tabular(
+    model: Type[T], row_regex: str, converters: Dict[str, Callable[[str], Any]]
+) -> Parser[List[T]]:
+    """
+    Match any number of consecutive rows of a table, each row matching ``row_regex``.
+
+    Each capture group of a row is converted by the matching converter in
+    ``converters``, which must list every field of the ``model`` dataclass in order.
+
+    This does the same as ``gather(model).many()``, but each row is matched by a single
+    regex rather than by a parser per field, which is faster for large tables.
+    """
+    field_names = tuple(field.name for field in fields(cast(Any, model)) if field.init)
+    if tuple(converters) != field_names:
+        raise ValueError(f"Expected converters for the fields {field_names}")
+    row = re.compile(row_regex)
+    convert_fns = tuple(converters.values())
+
+    @stateful_parser
+    def rows(state: TextState) -> Result[List[T]]:
+        items: List[T] = []
+        index = state.index
+        match = row.match(state.text, index)
+        while match and match.end() > index:
+            # Fields are passed positionally, which is cheaper than by keyword
+            items.append(
+                model(
+                    *[
+                        convert(value)
+                        for convert, value in zip(convert_fns, match.groups())
+                    ]
+                )
+            )
+            index = match.end()
+            match = row.match(state.text, index)
+        return state.at(index).success(items)
+
+    return rows.set_name(f"Rows of {model.__name__}")
+
+
 @dataclass
 class GradeInput:
     grade: int = take(string("Grade = ") >> integer << string("\n"))
+    # Same as `gather(Student).many()`
     students: List[Student] = take(
-        string("Student number, Name\n") >> gather(Student).many() << regex(r"\n*")
+        string("Student number, Name\n")
+        >> tabular(Student, r"(\d+), ([^\n]+)\n", {"number": int, "name": str})
+        << regex(r"\n*")
     )
+    # Same as `gather(Score).many()`
     scores: List[Score] = take(
-        string("Student number, Score\n") >> gather(Score).many() << regex(r"\n*")
+        string("Student number, Score\n")
+        >> tabular(Score, r"(\d+), (\d+)\n", {"number": int, "score": int})
+        << regex(r"\n*")
     )
 
 
@@ -130,10 +188,29 @@ class School:
     grades: List[Grade] = take(gather(GradeInput).map(Grade.from_input_grade).many())
 
 
+def scan_until(literal: str) -> Parser[str]:
+    """
+    Match all the text up to the next occurrence of ``literal``, without consuming
+    ``literal`` itself.
+
+    This is the same as ``regex(r"[\\s\\S]*?(?=literal)")``, but the literal is found
+    with a single ``str.find`` rather than by checking the lookahead at each character.
+    """
+
+    @stateful_parser
+    def parser(state: TextState) -> Result[str]:
+        end_index = state.text.find(literal, state.index)
+        if end_index == -1:
+            return state.failure(f"Text up to {literal!r}")
+        return state.at(end_index).success(state.text[state.index : end_index])
+
+    return parser
+
+
 @dataclass
 class File:
     # The header is everything up to the start of the text "School = ..."
-    header: str = take(regex(r"[\s\S]*?(?=School =)"))
+    header: str = take(scan_until("School ="))
     schools: List[School] = take(gather(School).many())
 
 
@@ -2,7 +2,6 @@ from dataclasses import dataclass
 from typing import List, Optional
 
 from parmancer import (
-    end_of_text,
     gather,
     gather_perm,
     padding,
@@ -164,13 +163,18 @@ def test_permutation_parser() -> None:
     parsers which may match 0 characters, because they may match nothing and be
     consumed when they were intended to match something in a different position.
     """
-    any_end = whitespace | end_of_text
+    # Each field's value and the whitespace or end of text after it are matched by a
+    # single regex, keeping only the value: this is equivalent to
+    # `regex(r"[a-zA-Z]+") << (whitespace | end_of_text)` with one regex call
+    any_end = r"(?:\s+|\Z)"
 
     @dataclass
     class Person:
-        name: str = take(regex(r"[a-zA-Z]+").set_name("name") << any_end)
-        age: int = take(regex(r"\d+").map(int).set_name("integer age") << any_end)
-        id: str = take(regex(r"\d{3}-\d{3}").set_name("id") << any_end)
+        name: str = take(regex(r"([a-zA-Z]+)" + any_end, group=1).set_name("name"))
+        age: int = take(
+            regex(r"(\d+)" + any_end, group=1).map(int).set_name("integer age")
+        )
+        id: str = take(regex(r"(\d{3}-\d{3})" + any_end, group=1).set_name("id"))
 
     parser = gather_perm(Person)
 
@@ -186,13 +190,14 @@ def test_key_value_parser() -> None:
     key-value pairs with known keys so a dataclass is the right data structure,
     but the keys may appear in any order in the input text.
     """
-    any_end = regex(r"[\s\n]+")
+    # Each line is matched by a single regex, keeping only the value
+    any_end = r"[\s\n]+"
 
     @dataclass
     class Person:
-        name: str = take(string("name: ") >> regex(r"[a-zA-Z]+") << any_end)
-        age: int = take(string("age: ") >> regex(r"\d+").map(int) << any_end)
-        id: str = take(string("id: ") >> regex(r"\d{3}-\d{3}") << any_end)
+        name: str = take(regex(r"name: ([a-zA-Z]+)" + any_end, group=1))
+        age: int = take(regex(r"age: (\d+)" + any_end, group=1).map(int))
+        id: str = take(regex(r"id: (\d{3}-\d{3})" + any_end, group=1))
 
     parser = padding >> gather_perm(Person) << padding
 
@@ -12,14 +12,20 @@ which succeeds when they are unambiguous and fails when they are ambiguous.
 
 import datetime
 from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional, Tuple
 
 import pytest
 from parmancer import (
     ParseError,
+    Parser,
+    Result,
+    TextState,
     end_of_text,
     gather,
     one_of,
     regex,
+    stateful_parser,
     string,
     take,
 )
@@ -39,25 +45,58 @@ class Date:
     month: int = take(two_digit.map(int) << string("/").optional())
     day: int = take(two_digit.map(int) << string("/").optional())
 
-    def to_date(self) -> datetime.date:
-        return datetime.date(year=self.year, month=self.month, day=self.day)
 
-
-def valid_date(date: Date) -> bool:
+@lru_cache(maxsize=1024)
+def make_date(year: int, month: int, day: int) -> Optional[datetime.date]:
+    """The date for the given values, or `None` if they don't form a valid date."""
     try:
-        datetime.date(year=date.year, month=date.month, day=date.day)
-        return True
+        return datetime.date(year=year, month=month, day=day)
     except ValueError:
-        return False
+        return None
 
 
-ymd = (gather(Date) << end_of_text).gate(valid_date)
-dmy = (gather(Date, field_order=("day", "month", "year")) << end_of_text).gate(
-    valid_date
-)
-mdy = (gather(Date, field_order=("month", "day", "year")) << end_of_text).gate(
-    valid_date
-)
+def to_valid_date(date_parser: Parser[Date]) -> Parser[datetime.date]:
+    """
+    Convert the result of ``date_parser`` to a ``datetime.date``, failing if it's not a
+    valid date. The date is only constructed once: to validate it and as the result.
+    """
+
+    @stateful_parser
+    def parser(state: TextState) -> Result[datetime.date]:
+        result = state.apply(date_parser)
+        date = make_date(result.value.year, result.value.month, result.value.day)
+        if date is None:
+            return result.state.failure("Valid date")
+        return result.state.success(date)
+
+    return parser
+
+
+# Regex for each field of `Date`.
+# The year is an atomic group (emulated with a lookahead and a backreference, for
+# Python < 3.11) so that, like `four_digit | two_digit`, 2 digits are only tried when
+# 4 digits don't match, rather than when the rest of the date doesn't match.
+date_field_patterns = {
+    "year": r"(?=(?P<year>\d{4}|\d{2}))(?P=year)",
+    "month": r"(?P<month>\d{2})",
+    "day": r"(?P<day>\d{2})",
+}
+
+
+def fused_date(field_order: Tuple[str, str, str]) -> Parser[Date]:
+    """
+    Equivalent to ``gather(Date, field_order=field_order)``, but all the fields and
+    separators are matched by a single regex.
+    """
+    pattern = "".join(date_field_patterns[name] + "/?" for name in field_order)
+    return regex(pattern, group=("year", "month", "day")).unpack(
+        lambda year, month, day: Date(int(year), int(month), int(day))
+    )
+
+
+ymd = to_valid_date(fused_date(("year", "month", "day")) << end_of_text)
+dmy = to_valid_date(fused_date(("day", "month", "year")) << end_of_text)
+mdy = to_valid_date(fused_date(("month", "day", "year")) << end_of_text)
 
 # `one_of` only succeeds if exactly one of its parsers match
 # This is how ambiguity leads to a failure: if 2 or more formats match, it will fail
@@ -70,7 +109,7 @@ def test_disambiguation() -> None:
     """
     date_cases = ["24/02/2023", "02/24/2023", "2023/02/24"]
     for date_case in date_cases:
-        assert date_parser.parse(date_case) == Date(2023, 2, 24)
+        assert date_parser.parse(date_case) == datetime.date(2023, 2, 24)
 
 
 def test_ambiguous() -> None:
@@ -83,6 +122,35 @@ def test_ambiguous() -> None:
             date_parser.parse(date_case)
 
 
+def test_fused_date_matches_gather() -> None:
+    """
+    Each single-regex date parser parses the same dates as gathering `Date`. Only the
+    failures differ: the regex fails at the start of the date.
+    """
+    texts = [
+        "2023/02/24",
+        "20230224",
+        "24/02/2023",
+        "24022023",
+        "12/02/23",
+        "120223",
+        "2023/02",
+        "1/2/3",
+        "2023/02/24/",
+        "12345678901",
+    ]
+    for field_order in [("year", "month", "day"), ("day", "month", "year")]:
+        fused = fused_date(field_order)
+        gathered = gather(Date, field_order=field_order)
+        for text in texts:
+            result = fused.parse_result(TextState.start(text))
+            expected = gathered.parse_result(TextState.start(text))
+            assert result.status == expected.status
+            if result.status:
+                assert result.value == expected.value
+                assert result.state.index == expected.state.index
+
+
 def test_self_contained_example() -> None:
     """A self-contained example for documentation"""
     from parmancer import one_of, seq, string
@@ -97,21 +97,47 @@ NOTE: Per [ABNF] and ISO8601, the "T" and "Z" characters in this
 """
 
 import datetime
+import re
 from dataclasses import dataclass
 from decimal import Decimal
-from typing import Any, List, Optional, Tuple
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 
 from parmancer import (
+    Parser,
+    Result,
+    TextState,
     gather,
     regex,
     seq,
+    stateful_parser,
     string,
     string_from,
     take,
 )
 
-two_digit = regex(r"\d{2}")
-four_digit = regex(r"\d{4}")
+
+def fixed_digits(count: int) -> Parser[str]:
+    """
+    Exactly ``count`` digits. DIGIT in the grammar is an ASCII digit, while ``\\d`` and
+    `str.isdigit` also match other Unicode digits.
+    Fields have a fixed width, so they can be checked directly without a regex.
+    """
+    message = f"{count} digits"
+
+    @stateful_parser
+    def parser(state: TextState) -> Result[str]:
+        end = state.index + count
+        digits = state.text[state.index : end]
+        if len(digits) == count and digits.isdigit() and digits.isascii():
+            return state.at(end).success(digits)
+        return state.failure(message)
+
+    return parser
+
+
+two_digit = fixed_digits(2)
+four_digit = fixed_digits(4)
 
 date_fullyear = four_digit
 date_month = two_digit
@@ -120,16 +146,51 @@ time_hour = two_digit
 time_minute = two_digit
 time_second = two_digit
 
+# Every 2 digit field value, to convert them with a lookup rather than `int`
+two_digit_values = {f"{value:02d}": value for value in range(100)}
+two_digit_value = two_digit.map(two_digit_values.__getitem__, "Two digit value")
+# There are too many 4 digit values to list, but only a few years tend to be used
+year_from_digits = lru_cache(maxsize=256)(int)
+four_digit_value = four_digit.map(year_from_digits, "Four digit value")
+
+
+signs = {"+": 1, "-": -1}
+
+
+@stateful_parser
+def sign(state: TextState) -> Result[int]:
+    """
+    The sign of an offset, from a single character. This is one dict lookup rather than
+    trying to match each sign in turn.
+    """
+    value = signs.get(state.text[state.index : state.index + 1])
+    if value is None:
+        return state.failure("+ or -")
+    return state.at(state.index + 1).success(value)
+
+
+@lru_cache(maxsize=1024)
+def fraction_from_digits(digits: str) -> Decimal:
+    """The fraction represented by the digits after a decimal point."""
+    return Decimal(digits).scaleb(-len(digits))
+
+
+@lru_cache(maxsize=None)
+def timezone_from_offset(sign: int, hour: int, minute: int) -> datetime.timezone:
+    """
+    The timezone for an offset from UTC. There are few distinct offsets in practice, so
+    each one is only constructed once.
+    """
+    return datetime.timezone(datetime.timedelta(hours=sign * hour, minutes=minute))
+
 
 @dataclass
 class Time:
-    hour: int = take(two_digit.map(int) << string(":"))
-    minute: int = take(two_digit.map(int) << string(":"))
-    second: int = take(two_digit.map(int))
+    hour: int = take(two_digit_value << string(":"))
+    minute: int = take(two_digit_value << string(":"))
+    second: int = take(two_digit_value)
     subsecond_fraction: Optional[Decimal] = take(
-        (
-            string(".") >> regex(r"\d+").map(lambda s: Decimal(s) / 10 ** len(s))
-        ).optional()
+        (string(".") >> regex(r"\d+").map(fraction_from_digits)).optional()
     )
 
     def microseconds(self) -> int:
@@ -151,16 +212,14 @@ class Time:
         )
 
 
-@dataclass
+@dataclass(frozen=True)
 class TimeOffset:
-    sign: int = take(string("+").result(1) | string("-").result(-1))
-    hour: int = take(two_digit.map(int) << string(":"))
-    minute: int = take(two_digit.map(int))
+    sign: int = take(sign)
+    hour: int = take(two_digit_value << string(":"))
+    minute: int = take(two_digit_value)
 
     def to_timezone(self) -> datetime.timezone:
-        return datetime.timezone(
-            datetime.timedelta(hours=self.sign * self.hour, minutes=self.minute)
-        )
+        return timezone_from_offset(self.sign, self.hour, self.minute)
 
 
 time_offset = string_from("Z", "z").result(TimeOffset(1, 0, 0)) | gather(TimeOffset)
@@ -168,9 +227,9 @@ time_offset = string_from("Z", "z").result(TimeOffset(1, 0, 0)) | gather(TimeOff
 
 @dataclass
 class Date:
-    year: int = take(four_digit.map(int) << string("-"))
-    month: int = take(two_digit.map(int) << string("-"))
-    day: int = take(two_digit.map(int))
+    year: int = take(four_digit_value << string("-"))
+    month: int = take(two_digit_value << string("-"))
+    day: int = take(two_digit_value)
 
     def to_date(self) -> datetime.date:
         return datetime.date(year=self.year, month=self.month, day=self.day)
@@ -204,7 +263,79 @@ time_with_zone = seq(
     time_offset.map(TimeOffset.to_timezone),
 ).unpack(Time.to_time)
 full_datetime = gather(DateTime).map(DateTime.to_datetime)
-parser = full_datetime | date | time_with_zone | time
+
+# The whole date-time grammar is regular, so it can also be matched by one regex
+# rather than by a parser per field: this is the same grammar as `full_datetime`
+full_datetime_pattern = re.compile(
+    r"(?P<year>[0-9]{4})-(?P<month>[0-9]{2})-(?P<day>[0-9]{2})[Tt ]"
+    r"(?P<hour>[0-9]{2}):(?P<minute>[0-9]{2}):(?P<second>[0-9]{2})"
+    r"(?:\.(?P<fraction>\d+))?"
+    r"(?:(?P<utc>[Zz])"
+    r"|(?P<sign>[+-])(?P<offset_hour>[0-9]{2}):(?P<offset_minute>[0-9]{2}))"
+)
+
+
+@stateful_parser
+def fused_datetime(state: TextState) -> Result[datetime.datetime]:
+    """Parse a date-time with a single regex match."""
+    match = full_datetime_pattern.match(state.text, state.index)
+    if match is None:
+        return state.failure(full_datetime_pattern.pattern)
+    # All fields are taken in one call, in the order of the groups in the pattern
+    (
+        year,
+        month,
+        day,
+        hour,
+        minute,
+        second,
+        fraction,
+        utc,
+        offset_sign,
+        offset_hour,
+        offset_minute,
+    ) = match.groups()
+    timezone = (
+        datetime.timezone.utc
+        if utc
+        else timezone_from_offset(
+            signs[offset_sign],
+            two_digit_values[offset_hour],
+            two_digit_values[offset_minute],
+        )
+    )
+    return state.at(match.end()).success(
+        datetime.datetime(
+            year_from_digits(year),
+            two_digit_values[month],
+            two_digit_values[day],
+            two_digit_values[hour],
+            two_digit_values[minute],
+            two_digit_values[second],
+            # Truncated to whole microseconds, like `Time.microseconds`
+            int(fraction[:6].ljust(6, "0")) if fraction else 0,
+            timezone,
+        )
+    )
+
+
+parser = fused_datetime | date | time_with_zone | time
+DateOrTime = Union[datetime.datetime, datetime.date, datetime.time]
+
+
+def parse_column(texts: Iterable[str]) -> List[DateOrTime]:
+    """
+    Parse many values, such as a column of a table.
+    Columns tend to repeat values, so each distinct value is only parsed once.
+    """
+    parsed: Dict[str, DateOrTime] = {}
+    values: List[DateOrTime] = []
+    for text in texts:
+        value = parsed.get(text)
+        if value is None:
+            value = parsed[text] = parser.parse(text)
+        values.append(value)
+    return values
 
 
 def test_datetime_parsing() -> None:
@@ -275,3 +406,18 @@ def test_datetime_parsing() -> None:
     # fmt: on
     for case, expected in test_cases:
         assert parser.parse(case) == expected
+
+    cases, expected_values = zip(*test_cases)
+    assert parse_column(cases * 2) == list(expected_values * 2)
+
+
+def test_fused_datetime() -> None:
+    """The single regex date-time parser agrees with the parser built from fields"""
+    cases = [
+        "2023-11-11T18:08:59Z",
+        "2023-11-11t18:08:59.3z",
+        "2023-11-11 18:08:59.1234567+08:45",
+        "2023-11-11T18:08:59.354934-01:00",
+    ]
+    for case in cases:
+        assert fused_datetime.parse(case) == full_datetime.parse(case)
@@ -6,10 +6,19 @@ built-in `json` module.
 This example shows some features of Parmancer for the familiar problem of parsing JSON.
 """
 
+from json.decoder import scanstring  # type: ignore[attr-defined]
 from pathlib import Path
 from typing import Any, Dict, Iterator, List, Union
 
-from parmancer import Parser, forward_parser, regex, string
+from parmancer import (
+    Parser,
+    Result,
+    TextState,
+    forward_parser,
+    regex,
+    stateful_parser,
+    string,
+)
 
 whitespace = regex(r"\s*").set_name("whitespace")
 
@@ -17,17 +26,38 @@ true = string("true").result(True)
 false = string("false").result(False)
 null = string("null").result(None)
 number = (
-    regex(r"-?(0|[1-9][0-9]*)(\.[0-9]+)?([eE][+-]?[0-9]+)?")
+    regex(r"-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?")
     .map(float, "float")
     .set_name("number")
 )
 
-unescaped_string = regex(r'([^"\\]|\\([/"bfnrt]|u[0-9a-fA-F]{4}))*').map(
-    lambda s: s.encode().decode("unicode-escape"),
-    map_name="unescape unicode",
-)
+# Runs of unescaped characters are matched together rather than one character at a time
+string_contents = r'(?:[^"\\]+|\\(?:[/"\\bfnrt]|u[0-9a-fA-F]{4}))*'
+
+
+def unescape(s: str) -> str:
+    """Replace escape sequences in a string; most strings don't have any."""
+    if "\\" not in s:
+        return s
+    # The escapes have already been validated by the regex, so the rest of the work is
+    # done by the standard library's string scanner, which is implemented in C.
+    # It scans up to the closing quote of a string. Like the regex, it isn't strict
+    # about control characters in the string.
+    unescaped: str = scanstring(s + '"', 0, False)[0]
+    return unescaped
 
-quoted_string = (string('"') >> unescaped_string << string('"')).set_name("string")
+
+quoted_string = (
+    regex(f'"({string_contents})"', group=1)
+    .map(unescape, map_name="unescape unicode")
+    .set_name("string")
+)
+# An object key along with the whitespace around it and the following colon
+object_key = (
+    regex(rf'\s*"({string_contents})"\s*:', group=1)
+    .map(unescape, map_name="unescape unicode")
+    .set_name("key")
+)
 
 # Type which matches the parser return value
 JSON = Union[Dict[str, "JSON"], List["JSON"], str, float, bool, None]
@@ -42,21 +72,108 @@ def empty_dict(_: Any) -> Dict[Any, Any]:
     return {}
 
 
-object_pair = (whitespace >> quoted_string << whitespace << string(":")) & _json_value
+object_end = regex(r"\s*}")
+array_end = regex(r"\s*]")
+object_pair = object_key & _json_value
 json_object = (
-    (string("{") >> object_pair.sep_by(string(",")) << whitespace << string("}"))
+    (string("{") >> object_pair.sep_by(string(",")) << object_end)
     .map(dict)
     .set_name("object")
 )
-array = (
-    string("[") >> _json_value.sep_by(string(",")) << whitespace << string("]")
-).set_name("array")
+array = (string("[") >> _json_value.sep_by(string(",")) << array_end).set_name("array")
 
-json_value = (
-    whitespace
-    >> (quoted_string | number | json_object | array | true | false | null)
-    << whitespace
-).set_name("value")
+# Each kind of value starts with different characters
+value_parsers: Dict[str, Parser[Any]] = {
+    '"': quoted_string,
+    "{": json_object,
+    "[": array,
+    "t": true,
+    "f": false,
+    "n": null,
+    **{start: number for start in "-0123456789"},
+}
+
+
+@stateful_parser
+def any_value(state: TextState) -> Result[JSON]:
+    """Parse a value using the parser chosen by its first character."""
+    parser = value_parsers.get(state.text[state.index : state.index + 1])
+    if parser is None:
+        return state.failure("value")
+    return parser.parse_result(state)
+
+
+json_value = (whitespace >> any_value << whitespace).set_name("value")
+
+# Parsers for values which don't contain other values
+scalar_parsers = {
+    start: parser
+    for start, parser in value_parsers.items()
+    if parser is not json_object and parser is not array
+}
+
+
+@stateful_parser
+def iterative_json_value(state: TextState) -> Result[JSON]:
+    """
+    Parse a value like `json_value`, but keep the objects and arrays which are being
+    parsed on a stack rather than parsing them recursively. Each nested value doesn't
+    use a Python call frame, so there's no limit on how deeply values can be nested.
+    """
+    # Objects and arrays which have been started, and the key of each open object's
+    # value which is currently being parsed
+    containers: List[Union[Dict[str, JSON], List[JSON]]] = []
+    keys: List[str] = []
+    while True:
+        # Parse a value, or start a new object or array
+        state = state.apply(whitespace).state
+        start = state.text[state.index : state.index + 1]
+        if start == "{" or start == "[":
+            state = state.at(state.index + 1)
+            end = state.apply(
+                object_end if start == "{" else array_end, raise_failure=False
+            )
+            if not end.status:
+                if start == "{":
+                    key = state.apply(object_key)
+                    state = key.state
+                    keys.append(key.value)
+                    containers.append({})
+                else:
+                    containers.append([])
+                continue
+            value: JSON = {} if start == "{" else []
+            state = end.state
+        else:
+            parser = scalar_parsers.get(start)
+            if parser is None:
+                return state.failure("value")
+            result = state.apply(parser)
+            value = result.value
+            state = result.state
+
+        # Add the value to its container, which may complete the container
+        while True:
+            state = state.apply(whitespace).state
+            if not containers:
+                return state.success(value)
+            container = containers[-1]
+            has_next = state.text.startswith(",", state.index)
+            if isinstance(container, dict):
+                container[keys.pop()] = value
+                if has_next:
+                    key = state.at(state.index + 1).apply(object_key)
+                    state = key.state
+                    keys.append(key.value)
+                    break
+                state = state.apply(object_end).state
+            else:
+                container.append(value)
+                if has_next:
+                    state = state.at(state.index + 1)
+                    break
+                state = state.apply(array_end).state
+            value = containers.pop()
 
 
 def test_json() -> None:
@@ -74,7 +191,35 @@ def test_json() -> None:
     assert result == {"a": "b", "c": {"d": 1.2}, "e": [True, False], "f": "\n"}
 
 
+def test_string_escapes() -> None:
+    result = json_value.parse(
+        r'["caf\u00e9 \"au lait\"\t\\ \/", "café", "\ud83d\ude00"]'
+    )
+
+    assert result == ['café "au lait"\t\\ /', "café", "\U0001f600"]
+
+
+def test_string_control_characters() -> None:
+    # Raw control characters are kept whether or not the string has escapes
+    assert json_value.parse('"a\tb"') == "a\tb"
+    assert json_value.parse('"a\tb\\n"') == "a\tb\n"
+
+
 def test_large_json() -> None:
     data = Path(__file__).parent.joinpath("json_data.json").read_text()
     result = json_value.parse(data)
     print(result)
+
+    assert iterative_json_value.parse(data) == result
+
+
+def test_iterative_json() -> None:
+    text = r'{"a": [1, {}, [], {"b": [true, null]}], "c": "\n" , "d" : {"e": false}}'
+    assert iterative_json_value.parse(text) == json_value.parse(text)
+
+    depth = 10_000
+    nested = iterative_json_value.parse("[" * depth + "]" * depth)
+    for _ in range(depth - 1):
+        assert isinstance(nested, list)
+        nested = nested[0]
+    assert nested == []
@@ -51,37 +51,47 @@ Student number, Name
 
 from __future__ import annotations
 
-import inspect
-import operator
+import sys
 from dataclasses import dataclass, field
-from functools import reduce
-from typing import Any, List, Tuple
+from functools import lru_cache
+from types import FrameType
+from typing import Any, ClassVar, List, Optional, Tuple
 
 from typing_extensions import Self, TypeVar
 
 from examples.dataclass_parser_demo import File, text
 from parmancer import Result, TextState, gather
+from parmancer.parser import _slots
 
 _T = TypeVar("_T")
 
 
 class _Missing:
-    pass
+    __slots__ = ()
 
 
 Missing = _Missing()
 
 
-@dataclass
+# A node is created for every parser step, so they're slotted where possible
+@dataclass(**_slots)
 class Node:
     """Represent a node of the tree: a parser name, its children, and a result if one has been parsed."""
 
     name: str
     children: List[Node]
     result: Any = Missing
+    # The tree is displayed again at every step, so each result is only formatted once
+    result_repr: Optional[str] = field(default=None, init=False, repr=False)
 
     def become(self, other: Node) -> None:
         self.result = other.result
+        self.result_repr = other.result_repr
+
+    def display_result(self) -> str:
+        if self.result_repr is None:
+            self.result_repr = repr(self.result)
+        return self.result_repr
 
     @staticmethod
     def default() -> Node:
@@ -111,17 +121,20 @@ def append_tree(
         node = child
     if parent.name.startswith("field:"):
         # Hack to make dataclass fields get their result
-        parent.result = leaf.result
+        parent.become(leaf)
     node.become(leaf)
 
     if prune_children_of_results:
         node.children = []
 
 
-def display_tree_order_by_entry(tree: Node, indent_width: int = 2) -> None:
+def display_tree_order_by_entry(
+    tree: Node, indent_width: int = 2, out: Optional[List[str]] = None
+) -> None:
     """
     Display a tree, where the order top-to-bottom is determined by
     when the node was first entered.
+    The output is written all at once, or appended to ``out`` if it is given.
 
     Here is an example of this ordering, the parsers are listed in order of when
     they entered the parse tree.
@@ -146,23 +159,36 @@ def display_tree_order_by_entry(tree: Node, indent_width: int = 2) -> None:
     ```
     """
 
+    lines: List[str] = [] if out is None else out
+
     def _display(tree: Node, indent: str = "") -> None:
-        print(
-            tree.name + (f": {repr(tree.result)}" if tree.result is not Missing else "")
+        lines.append(
+            tree.name
+            + (f": {tree.display_result()}" if tree.result is not Missing else "")
+            + "\n"
         )
         if len(tree.children) == 0:
             return
         for child in tree.children[:-1]:
-            print(indent + "├" + "─" * indent_width, end="")
+            lines.append(indent + "├" + "─" * indent_width)
             _display(child, indent + "│" + " " * indent_width)
         child = tree.children[-1]
-        print(indent + "└" + "─" * indent_width, end="")
+        lines.append(indent + "└" + "─" * indent_width)
         _display(child, indent + " " * (indent_width + 1))
 
     _display(tree)
+    if out is None:
+        sys.stdout.write("".join(lines))
 
 
-def display_tree_order_by_return(tree: Node, indent_width: int = 2) -> None:
+def display_tree_order_by_return(
+    tree: Node, indent_width: int = 2, out: Optional[List[str]] = None
+) -> None:
+    """
+    Display a tree, where the latest parser to have returned a result is shown at the
+    bottom. The output is written all at once, or appended to ``out`` if it is given.
+    """
+    lines: List[str] = [] if out is None else out
     hbar = "─" * indent_width
     vbar = "│" + " " * indent_width
 
@@ -181,7 +207,7 @@ def display_tree_order_by_return(tree: Node, indent_width: int = 2) -> None:
         display_before = tree.result is Missing
         if display_before:
             # Top-down print
-            print(indent + split + tree.name)
+            lines.append(indent + split + tree.name + "\n")
             if len(tree.children) == 0:
                 return
             for child in tree.children[:-1]:
@@ -192,7 +218,7 @@ def display_tree_order_by_return(tree: Node, indent_width: int = 2) -> None:
         else:
             # Bottom-up print
             if len(tree.children) == 0:
-                print(indent + split + f"{tree.name}: {repr(tree.result)}")
+                lines.append(indent + split + f"{tree.name}: {tree.display_result()}\n")
                 return
             child = tree.children[0]
 
@@ -211,71 +237,107 @@ def display_tree_order_by_return(tree: Node, indent_width: int = 2) -> None:
                     bi_split,
                     depth + 1,
                 )
-            print(indent + split + f"{tree.name}: {repr(tree.result)}")
+            lines.append(indent + split + f"{tree.name}: {tree.display_result()}\n")
 
     _display(tree)
+    if out is None:
+        sys.stdout.write("".join(lines))
 
 
-@dataclass
+@lru_cache(maxsize=None)
+def name_parts(name: str) -> Tuple[str, ...]:
+    """The parts of a parser name which are separated by `/`."""
+    return tuple(name.split("/"))
+
+
+@dataclass(**_slots)
 class ParseStack:
     path: Tuple[str, ...]
 
     @staticmethod
     def get_from_stack() -> ParseStack:
-        stack = inspect.stack()
-        try:
-            context = reduce(
-                operator.add,
-                list(
-                    reversed(
-                        list(
-                            element.frame.f_locals["self"].name.split("/")
-                            for element in stack
-                            if element.function == "parse_result"
-                        )
-                    )
-                ),
-            )
-            return ParseStack(context)
-        finally:
-            del stack
+        # Walk the frames directly: `inspect.stack` is much slower as it also looks up
+        # the source code of every frame
+        names: List[Tuple[str, ...]] = []
+        frame: Optional[FrameType] = sys._getframe(1)
+        while frame is not None:
+            if frame.f_code.co_name == "parse_result":
+                names.append(name_parts(frame.f_locals["self"].name))
+            frame = frame.f_back
+        path: List[str] = []
+        for parts in reversed(names):
+            path.extend(parts)
+        return ParseStack(tuple(path))
 
     def __str__(self: Self) -> str:
         return "/".join(self.path)
 
 
-def display_parser_state(state: TextState, value: Any, tree: Node) -> None:
-    call_stack = inspect.stack()
-    try:
-        stack = ParseStack.get_from_stack()
-        node = Node(stack.path[-1], [], result=value)
-
-        append_tree(tree, stack.path, node)
-
-        display_tree_order_by_return(tree)
-        print("-" * 80)
-        print(stack)
-        print("-" * 80)
-        print(state.context_display(), end="")
-        print("-" * 80)
-        input()
-    finally:
-        del call_stack
+def display_parser_state(
+    state: TextState, value: Any, tree: Node, interactive: bool = True
+) -> None:
+    """
+    Add the latest result to the tree, then display the parser state and wait for input.
+    When not ``interactive``, only the tree is updated.
+    """
+    stack = ParseStack.get_from_stack()
+    node = Node(stack.path[-1], [], result=value)
+
+    append_tree(tree, stack.path, node)
+    if not interactive:
+        return
+
+    # The whole display is written at once rather than line by line
+    out: List[str] = []
+    display_tree_order_by_return(tree, out=out)
+    separator = "-" * 80 + "\n"
+    out.extend(
+        (separator, str(stack), "\n", separator, state.context_display(), separator)
+    )
+    sys.stdout.write("".join(out))
+    input()
 
 
 @dataclass(frozen=True)
 class StepVisualizer(TextState):
+    observes_steps: ClassVar[bool] = True
     tree: Node = field(default_factory=Node.default)
+    # Without a terminal to step through the parser with, only the tree is recorded
+    interactive: bool = field(
+        default_factory=lambda: sys.stdin is not None and sys.stdin.isatty()
+    )
 
     def success(self: Self, value: _T) -> Result[_T]:
-        display_parser_state(self, value, self.tree)
+        display_parser_state(self, value, self.tree, self.interactive)
         return super().success(value)
 
     def failure(self: Self, message: str) -> Result[Any]:
-        display_parser_state(self, "<<<Parser failed>>>", self.tree)
+        display_parser_state(self, "<<<Parser failed>>>", self.tree, self.interactive)
         return super().failure(message)
 
 
+def test_record_tree() -> None:
+    state = StepVisualizer(text, 0, interactive=False)
+    result = gather(File).parse_result(state)
+
+    assert result.status
+    [file_node] = state.tree.children
+    assert file_node.name == "Data:File"
+    # Each field of the dataclass gets the result of its parser
+    header, schools = file_node.children[:2]
+    assert (header.name, header.result) == ("field:header", result.value.header)
+    assert (schools.name, schools.result) == ("field:schools", result.value.schools)
+
+
+def test_not_interactive_without_stdin() -> None:
+    stdin = sys.stdin
+    try:
+        sys.stdin = None
+        assert StepVisualizer(text, 0).interactive is False
+    finally:
+        sys.stdin = stdin
+
+
 if __name__ == "__main__":
     # Running this file will show the parser state each time a successful parser is found
     gather(File).parse(text, state_handler=StepVisualizer)
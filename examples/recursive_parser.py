@@ -1,6 +1,7 @@
+import operator
 from typing import Iterator, List, Tuple, Union
 
-from parmancer import Parser, forward_parser, regex, string
+from parmancer import Parser, forward_parser, regex, seq, string
 
 RT = Union[int, List["RT"]]
 
@@ -15,6 +16,10 @@ def test_recursive_parser() -> None:
     This works because the forward_parser generator can refer the target parser before
     the target parser is defined. Then, when defining the parser, it can use `_parser`
     to indirectly refer to itself, creating a recursive parser.
+
+    The generator is only run the first time `_parser` is used: after that, `_parser`
+    hands each call straight to the parser it refers to, so recursing through it
+    costs no more than calling `parser` directly.
     """
     digits = regex("[0-9]+").map(int)
 
@@ -73,3 +78,31 @@ def test_indirect_recursive_parser() -> None:
     result = third.parse(">(first>(second>(3)))")
 
     assert result == ("first", ("second", 3))
+
+
+def test_memoized_recursive_parser() -> None:
+    """
+    When alternatives start with the same recursive parser, it's parsed again for each
+    alternative which is tried. Nested inside itself, the amount of work grows
+    exponentially with the depth: here each level of brackets would be parsed 3 times
+    by the level above it.
+
+    Memoizing the shared parser means that it's only run once at each position in the
+    text, so the work grows linearly instead.
+    """
+    digits = regex("[0-9]+").map(int)
+
+    @forward_parser
+    def _expression() -> Iterator[Parser[int]]:
+        yield expression
+
+    term = (digits | string("(") >> _expression << string(")")).memoize()
+    expression: Parser[int] = (
+        seq(term << string("+"), _expression).unpack(operator.add)
+        | seq(term << string("-"), _expression).unpack(operator.sub)
+        | term
+    )
+
+    depth = 50
+    assert expression.parse("(" * depth + "1" + ")" * depth) == 1
+    assert expression.parse("(1+(2-(3+4)))-5") == -9
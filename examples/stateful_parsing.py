@@ -37,19 +37,26 @@ class Person:
 
 
 def test_stateful_parser() -> None:
+    # Parsers used by the stateful parser are created once, outside of it, rather than
+    # every time it runs
+    word = regex(r"\w+") << whitespace
+    number = (regex(r"\d+") << whitespace).map(int)
+    rest_of_line = regex(".+")
+    odd_note = rest_of_line >> success("Odd age")
+
     @stateful_parser
     def person_parser(s: TextState) -> Result[Person]:
-        name = s.apply(regex(r"\w+") << whitespace)
-        age = name.state.apply((regex(r"\d+") << whitespace).map(int))
+        name = s.apply(word)
+        age = name.state.apply(number)
 
         # Example: setting a breakpoint here, we'll see the parsed values for name and
         # age in a debugger, and `s` will contain the input text and current index
 
         if age.value % 2:
             # Parsing can depend on previously parsed values
-            note = age.state.apply(regex(".+") >> success("Odd age"))
+            note = age.state.apply(odd_note)
         else:
-            note = age.state.apply(regex(".+"))
+            note = age.state.apply(rest_of_line)
 
         # Finally, return a success from the state `s` - any downstream parsers will
         # pick up the remaining state from here.
@@ -63,11 +70,14 @@ def test_stateful_parser() -> None:
 
 
 def test_stateful_parser_failure() -> None:
+    word = regex(r"\w+") << whitespace
+    number = (regex(r"\d+").set_name("digit") << whitespace).map(int)
+
     @stateful_parser
     def person(s: TextState) -> Result[Person]:
-        name = s.apply(regex(r"\w+") << whitespace)
+        name = s.apply(word)
 
-        age = name.state.apply((regex(r"\d+").set_name("digit") << whitespace).map(int))
+        age = name.state.apply(number)
 
         return age.state.success(Person(name.value, age.value, "default"))
 
@@ -144,6 +144,7 @@ from parmancer.parser import (
     Parser,
     Result,
     TextState,
+    alt,
     any_char,
     char_from,
     end_of_text,
@@ -178,6 +179,7 @@ __all__ = [
     "end_of_text",
     "from_enum",
     "seq",
+    "alt",
     "one_of",
     "success",
     "look_ahead",
@@ -200,7 +202,7 @@ r"""1 or more spaces: `regex(r"\s+")`"""
 padding: Parser[str] = regex(r"\s*")
 r"""0 or more spaces: `regex(r"\s*")`"""
 
-letter: Parser[str] = any_char.gate(lambda c: c.isalpha()).set_name("Letter")
+letter: Parser[str] = any_char.gate(str.isalpha).set_name("Letter")
 r"""A character ``c`` for which ``c.isalpha()`` is true."""
 
 digit: Parser[str] = regex(r"[0-9]").set_name("Digit")
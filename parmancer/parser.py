@@ -1,12 +1,13 @@
 from __future__ import annotations
 
 import enum
+import itertools
 import operator
 import re
 import sys
-from copy import copy
 from dataclasses import Field, dataclass, field, fields
-from functools import partial, reduce
+from functools import lru_cache, reduce
+from inspect import Parameter, signature
 from typing import (
     Any,
     Callable,
@@ -54,9 +55,12 @@ __all__ = [
     "Result",
     "ResultAsException",
     "String",
+    "Char",
     "Regex",
     "Bind",
+    "CachedParser",
     "Choice",
+    "ComposedMap",
     "DataclassPermutation",
     "DataclassProtocol",
     "DataclassSequence",
@@ -65,10 +69,14 @@ __all__ = [
     "FailureInfo",
     "ForwardParser",
     "Gate",
+    "CharGate",
+    "CharsUntil",
     "KeepOne",
     "LineColumn",
     "LookAhead",
     "Map",
+    "RegexMap",
+    "MappedSequence",
     "MapFailure",
     "OneOf",
     "ParseError",
@@ -111,7 +119,7 @@ class SupportsSelfAdd(Protocol[T]):
     def __add__(self, other: T, /) -> T: ...
 
 
-@dataclass(frozen=True, eq=True)
+@dataclass(frozen=True, eq=True, **_slots)
 class FailureInfo:
     """Information about a parsing failure: the text index and a message."""
 
@@ -119,6 +127,41 @@ class FailureInfo:
     message: str
 
 
+# Successful results don't have failure info; they all share this placeholder
+_NO_FAILURE = FailureInfo(-1, "")
+
+# Backtracking parsers fail at the same index with the same message over and over, so
+# failure info is shared between those failures rather than created for each one
+_failure_info = lru_cache(maxsize=4096)(FailureInfo)
+
+
+def _concat(values: Iterable[SupportsSelfAdd[T]]) -> T:
+    """
+    Add values together. Strings are joined in one step rather than adding them one at a
+    time, which would build a new intermediate string for every value.
+    """
+    items: List[Any] = list(values)
+    if items and all(isinstance(item, str) for item in items):
+        return cast(T, "".join(items))
+    return cast(T, reduce(operator.add, items))
+
+
+_extra_field_names_cache: Dict[type, Tuple[str, ...]] = {}
+
+
+def _extra_field_names(state_type: Type[TextState]) -> Tuple[str, ...]:
+    """Names of the fields a `TextState` subclass adds to the basic `TextState` fields."""
+    names = _extra_field_names_cache.get(state_type)
+    if names is None:
+        names = tuple(
+            field.name
+            for field in fields(state_type)
+            if field.name not in ("text", "index", "failures", "memo")
+        )
+        _extra_field_names_cache[state_type] = names
+    return names
+
+
 @dataclass(frozen=True, **_slots)
 class TextState:
     """
@@ -136,6 +179,21 @@ class TextState:
     """Index at start of the remaining unparsed text."""
     failures: Tuple[FailureInfo, ...] = tuple()
     """Previously encountered parsing failures, used for reporting parser failures."""
+    memo: Dict[int, Dict[int, Result[Any]]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    """
+    Results of memoized parsers, by parser ID and then text index. Each new state gets
+    its own memo, and every state made from it with `progress` shares that memo, so
+    results are only reused within one parse.
+    """
+
+    observes_steps: ClassVar[bool] = False
+    """
+    Whether this type of state must see every parser step through `success` and
+    `failure`. Some parsers take shortcuts which skip the steps of the parsers inside
+    them, but not for states which observe steps.
+    """
 
     @classmethod
     def start(cls: Type[Self], text: str) -> Self:
@@ -153,19 +211,27 @@ class TextState:
         This is similar to making a shallow copy but doesn't require mutation after
         the copy is made.
         """
-        return type(self)(
+        if type(self) is TextState:
+            return cast(Self, _new_text_state(self.text, index, failures, self.memo))
+        extra_fields = _extra_field_names(type(self))
+        state = type(self)(
             self.text,
             index,
             failures,
-            **{
-                field.name: getattr(self, field.name)
-                for field in fields(self)
-                if field.name not in ("text", "index", "failures")
-            },
+            **{name: getattr(self, name) for name in extra_fields},
         )
+        object.__setattr__(state, "memo", self.memo)
+        return state
 
     def at(self: Self, index: int) -> Self:
         """Move `index` to the given value, returning a new state."""
+        if index == self.index:
+            # States are immutable so the same state can be reused
+            return self
+        if type(self) is TextState:
+            return cast(
+                Self, _new_text_state(self.text, index, self.failures, self.memo)
+            )
         return self.progress(index, self.failures)
 
     def apply(
@@ -182,11 +248,11 @@ class TextState:
 
     def success(self: Self, value: T) -> Result[T]:
         """Produce a success Result with the given value."""
-        return Result(True, self, FailureInfo(-1, ""), value)
+        return Result(True, self, _NO_FAILURE, value)
 
     def failure(self: Self, message: str) -> Result[Any]:
         """Create a failure Result with the given failure message."""
-        info = FailureInfo(index=self.index, message=message)
+        info = _failure_info(self.index, message)
         furthest_failure = (
             max(info.index for info in self.failures) if self.failures else -1
         )
@@ -235,6 +301,41 @@ class TextState:
         return self.text[self.index :]
 
 
+if sys.version_info >= (3, 10):
+    # A frozen dataclass' `__init__` sets each field through `object.__setattr__`, which
+    # is most of the cost of creating a state. Plain `TextState`s are created on every
+    # step of parsing, so their slots are written directly instead
+    _set_text = TextState.__dict__["text"].__set__
+    _set_index = TextState.__dict__["index"].__set__
+    _set_failures = TextState.__dict__["failures"].__set__
+    _set_memo = TextState.__dict__["memo"].__set__
+
+    def _new_text_state(
+        text: str,
+        index: int,
+        failures: Tuple[FailureInfo, ...],
+        memo: Dict[int, Dict[int, Result[Any]]],
+    ) -> TextState:
+        state = object.__new__(TextState)
+        _set_text(state, text)
+        _set_index(state, index)
+        _set_failures(state, failures)
+        _set_memo(state, memo)
+        return state
+
+else:
+
+    def _new_text_state(
+        text: str,
+        index: int,
+        failures: Tuple[FailureInfo, ...],
+        memo: Dict[int, Dict[int, Result[Any]]],
+    ) -> TextState:
+        state = TextState(text, index, failures)
+        object.__setattr__(state, "memo", memo)
+        return state
+
+
 class ParseError(ValueError):
     """A parsing error."""
 
@@ -372,7 +473,7 @@ class Parser(Generic[T_co]):
 
     def __or__(self: Parser[T1], other: Parser[T2]) -> Parser[T1 | T2]:
         """Match either self or other, returning the first parser which succeeds."""
-        return Choice(parsers=(self, other))
+        return alt(self, other)
 
     def many(
         self: Parser[T_co],
@@ -429,6 +530,15 @@ class Parser(Generic[T_co]):
             must succeed
         :return: A new parser which will repeat the previous parser until ``until_parser``
         """
+        if (
+            type(self) is Span
+            and self.length == 1
+            and type(until_parser) in (String, Char)
+            and cast(String, until_parser).string
+        ):
+            # `self` is `any_char`, so each item is one character of the text
+            chars_until = CharsUntil(self, until_parser, min_count, max_count)
+            return cast(Parser[List[T_co]], chars_until)
         return Until(self, until_parser, min_count, max_count)
 
     def sep_by(
@@ -498,6 +608,14 @@ class Parser(Generic[T_co]):
             if hasattr(map_fn, "__name__"):
                 map_name = map_fn.__name__
 
+        if type(self) in (RegexMap, MappedSequence, ComposedMap):
+            # Mapping a map composes the two functions, so it's still one step
+            return ComposedMap(parser=self, map_callable=map_fn, map_name=map_name)
+        if type(self) is Regex:
+            return RegexMap(parser=self, map_callable=map_fn, map_name=map_name)
+        if type(self) is Sequence:
+            sequence_fn = cast(Callable[[Tuple[Any, ...]], T2], map_fn)
+            return MappedSequence(self, sequence_fn, map_name)
         return Map(parser=self, map_callable=map_fn, map_name=map_name)
 
     def map_failure(
@@ -523,7 +641,7 @@ class Parser(Generic[T_co]):
         :return: An updated parser which will unpack its result into ``transform_fn``
             to produce a new result
         """
-        return self.bind(lambda value: Success(transform_fn(*value))).set_name("Unpack")
+        return self.map(lambda value: transform_fn(*value)).set_name("Unpack")
 
     def __and__(self: Parser[T1], other: Parser[T2]) -> Parser[Tuple[T1, T2]]:
         """Combine two parsers in sequence, combining their result values into a tuple
@@ -565,10 +683,8 @@ class Parser(Generic[T_co]):
         assert appended.parse("FirstSecond") == ("First", "Second")
         ```
         """
-        return self.bind(
-            lambda self_value: other.bind(
-                lambda other_value: Success((*self_value, other_value))
-            )
+        return Sequence(parsers=(self, other)).map(
+            lambda values: (*values[0], values[1]), "Append"
         )
 
     def list(self: Parser[T]) -> Parser[List[T]]:
@@ -685,7 +801,7 @@ class Parser(Generic[T_co]):
         ```
         """
 
-        return self.map(partial(reduce, operator.add), "Concat")
+        return self.map(_concat, "Concat")
 
     # >>
     def __rshift__(self, other: Parser[T]) -> Parser[T]:
@@ -736,6 +852,10 @@ class Parser(Generic[T_co]):
         Fail the parser if ``gate_function`` returns False when called on the result,
         otherwise succeed without changing the result.
         """
+        if type(self) is Span and self.length == 1:
+            # `self` is `any_char`, so ``T`` is ``str``
+            char_gate = CharGate(self, cast(Callable[[str], bool], gate_function))
+            return cast(Parser[T], char_gate)
         return Gate(self, gate_function)
 
     @overload
@@ -763,6 +883,29 @@ class Parser(Generic[T_co]):
         self.name: str = description
         return self
 
+    def memoize(self: Parser[T]) -> Parser[T]:
+        r"""
+        Cache the result of this parser at each position in the text, so that it is only
+        run once per position even when it's reached by several alternatives.
+
+        This is worthwhile for grammars with a lot of backtracking, where the same
+        parser is retried at the same position by different branches; for other
+        grammars the cache is only an overhead.
+
+        ```python
+        from parmancer import regex, string
+
+        number = regex(r"\d+").map(int).memoize()
+        parser = number << string("!") | number << string("?")
+
+        # `number` is only run once at the start of the text
+        assert parser.parse("12?") == 12
+        ```
+
+        The parser result must only depend on the text and the position in the text.
+        """
+        return CachedParser(self)
+
     def breakpoint(self) -> Parser[T_co]:
         """Insert a breakpoint before the current parser runs, for debugging."""
 
@@ -825,9 +968,20 @@ class String(Parser[str]):
         self.name: str = repr(self.string)
 
     def parse_result(self, state: TextState) -> Result[str]:
-        end_index = state.index + len(self.string)
-        if state.text[state.index : end_index] == self.string:
-            return state.at(end_index).success(self.string)
+        # Compare in place rather than slicing the text
+        if state.text.startswith(self.string, state.index):
+            return state.at(state.index + len(self.string)).success(self.string)
+
+        return state.failure(self.name)
+
+
+@dataclass
+class Char(String):
+    """`String` for a single character, which is compared directly."""
+
+    def parse_result(self, state: TextState) -> Result[str]:
+        if state.text[state.index : state.index + 1] == self.string:
+            return state.at(state.index + 1).success(self.string)
 
         return state.failure(self.name)
 
@@ -843,6 +997,8 @@ def string(string: str) -> Parser[str]:
     assert string("ab").many().parse("abab") == ["ab", "ab"]
     ```
     """
+    if len(string) == 1:
+        return Char(string)
     return String(string)
 
 
@@ -1002,17 +1158,35 @@ def regex(
     The optional ``flags`` is passed to ``re.compile``.
     """
     if isinstance(pattern, str):
-        exp = re.compile(pattern, flags)
+        exp = _compile(pattern, flags)
     else:
         if flags:
-            # Need to recompile with the specified flags
-            exp = re.compile(pattern.pattern, flags)
+            # Need to recompile with the specified flags as well as the pattern's own
+            # flags. `re.UNICODE` is left out as it's the default for str patterns and
+            # can't be combined with `re.ASCII`
+            own_flags = pattern.flags & ~re.UNICODE
+            exp = _compile(pattern.pattern, re.RegexFlag(own_flags | flags))
         else:
             exp = pattern
 
+    if exp.pattern in _WHITESPACE_PATTERNS:
+        return _WhitespaceRegex(exp, flags, group)
     return Regex(exp, flags, group)
 
 
+# Patterns which are matched by `_WhitespaceRegex`
+_WHITESPACE_PATTERNS = (r"\s+", r"\s*")
+
+
+@lru_cache(maxsize=None)
+def _compile(pattern: str, flags: re.RegexFlag) -> Pattern[str]:
+    """
+    Compile a regex pattern. Parsers with the same pattern share one compiled pattern,
+    which isn't evicted from a cache like the one used by ``re.compile``.
+    """
+    return re.compile(pattern, flags)
+
+
 @dataclass
 class Regex(Parser[Any]):
     """
@@ -1027,18 +1201,60 @@ class Regex(Parser[Any]):
 
     def __post_init__(self) -> None:
         self.name: str = self.pattern.pattern
+        # The pattern is compiled once up front; matching only needs the group args.
+        # Group names are resolved to group numbers here rather than on every match
+        groups = (self.group,) if isinstance(self.group, (int, str)) else self.group
+        self.group_args: Tuple[str | int, ...] = tuple(
+            self.pattern.groupindex.get(group, group)
+            if isinstance(group, str)
+            else group
+            for group in groups
+        )
 
     def parse_result(self, state: TextState) -> Result[str | Tuple[str, ...]]:
+        # Matching happens in place, from the current index, in `re`'s C engine: for
+        # the simple patterns which are common in parsers, such as `\s*` or `[0-9]+`,
+        # one call into it is cheaper than stepping through the text in Python.
         match = self.pattern.match(state.text, state.index)
         if match:
-            # match.group needs to be broken into multiple cases to make type checking to work
-            if isinstance(self.group, (int, str)):
-                return state.at(match.end()).success(match.group(self.group))
-            return state.at(match.end()).success(match.group(*self.group))
+            return state.at(match.end()).success(match.group(*self.group_args))
         else:
             return state.failure(self.name)
 
 
+@dataclass
+class _WhitespaceRegex(Regex):
+    """
+    A `Regex` for a pattern whose matches all start with whitespace, unless they're
+    empty, such as ``\\s*``.
+
+    Whitespace parsers are often tried at positions where there's no whitespace, so the
+    next character is checked before running the regex.
+    """
+
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        empty_match = self.pattern.match("")
+        self.empty_value: Optional[str | Tuple[str, ...]] = (
+            None if empty_match is None else empty_match.group(*self.group_args)
+        )
+
+    def parse_result(self, state: TextState) -> Result[str | Tuple[str, ...]]:
+        if not state.text[state.index : state.index + 1].isspace():
+            if self.empty_value is None:
+                return state.failure(self.name)
+            return state.success(self.empty_value)
+        match = self.pattern.match(state.text, state.index)
+        if match:
+            return state.at(match.end()).success(match.group(*self.group_args))
+        else:
+            return state.failure(self.name)
+
+
+# Parsers skipped by a `Choice` before running the next parser, or ``None`` at the end
+ChoiceStep: TypeAlias = "Tuple[Tuple[String, ...], Optional[Parser[Any]]]"
+
+
 @dataclass
 class Choice(Parser[Any]):
     """Try parsers in order until one succeeds."""
@@ -1063,33 +1279,148 @@ class Choice(Parser[Any]):
     def __post_init__(self) -> None:
         if not self.parsers:
             raise ValueError("The Choice parser requires at least one parser")
+        # Parsers which start with a string literal can't match unless the text starts
+        # with the literal's first character, so they can be skipped without running
+        # them. Which parsers are run is planned once for each next character
+        self.literals: Tuple[Optional[String], ...] = tuple(
+            _leading_string(parser) for parser in self.parsers
+        )
+        self.plans: Dict[str, Tuple[ChoiceStep, ...]] = {}
+
+    def plan(self, char: str) -> Tuple[ChoiceStep, ...]:
+        """
+        The parsers to run when the next character is ``char``, each with the literals
+        skipped just before it. A final step without a parser has the skipped literals
+        at the end.
+        """
+        steps: List[ChoiceStep] = []
+        skipped: List[String] = []
+        for parser, literal in zip(self.parsers, self.literals):
+            if literal is not None and not literal.string.startswith(char):
+                skipped.append(literal)
+            else:
+                steps.append((tuple(skipped), parser))
+                skipped = []
+        if skipped:
+            steps.append((tuple(skipped), None))
+        return tuple(steps)
 
     def parse_result(self, state: TextState) -> Result[Any]:
-        for parser in self.parsers:
+        index = state.index
+        # States which observe every step have every parser run
+        char = "" if state.observes_steps else state.text[index : index + 1]
+        plan = self.plans.get(char)
+        if plan is None:
+            plan = self.plans[char] = self.plan(char)
+
+        for skipped, parser in plan:
+            if parser is None:
+                # The last parsers were skipped, so the result is the last failure
+                state = _add_failures(state, skipped[:-1])
+                return state.failure(skipped[-1].name)
+            if skipped:
+                state = _add_failures(state, skipped)
             result = parser.parse_result(state)
             if result.status:
                 return result
-            state = result.state.at(state.index)
+            state = result.state.at(index)
         return result  # pyright: ignore
 
     def set_name(self: Self, description: str) -> Parser[Tuple[Any, ...]]:
         self.is_grouped = True
         return super().set_name(description)
 
-    def __or__(self: Self, other: Parser[Any]) -> Parser[Any]:
-        # If self or other are already Choice parsers and are not grouped, then
-        # flatten their parsers rather than putting them in nested Choices
-        if isinstance(self, Choice) and not self.is_grouped:
-            self_parsers = self.parsers
-        else:
-            self_parsers = (self,)
 
-        if isinstance(other, Choice) and not other.is_grouped:
-            other_parsers = other.parsers
+def _leading_string(parser: Parser[Any]) -> Optional[String]:
+    """
+    The string literal which ``parser`` matches first, if there is one, such as ``"("``
+    for ``string("(") >> value``. When that literal doesn't match, ``parser`` fails
+    with the literal's own failure.
+    """
+    while True:
+        if type(parser) in (String, Char):
+            literal = cast(String, parser)
+            return literal if literal.string else None
+        if type(parser) is KeepOne:
+            parser = parser.left[0] if parser.left else parser.keep
+        elif type(parser) is Map:
+            parser = parser.parser
         else:
-            other_parsers = (other,)
+            return None
+
+
+def _add_failures(state: TextState, literals: Tuple[String, ...]) -> TextState:
+    """
+    The state after each literal has failed in turn at the current index, the same as
+    calling ``state.failure`` with each literal's name.
+    """
+    if not literals:
+        return state
+    furthest_failure = (
+        max(info.index for info in state.failures) if state.failures else -1
+    )
+    if furthest_failure > state.index:
+        return state
+    infos = tuple(_failure_info(state.index, literal.name) for literal in literals)
+    if furthest_failure == state.index:
+        infos = (*state.failures, *infos)
+    return state.with_failures(infos)
+
+
+# fmt: off
+@overload
+def alt(parser_0: Parser[T1], /) -> Parser[T1]: ...
+
+@overload
+def alt(parser_0: Parser[T1], parser_1: Parser[T2], /) -> Parser[T1 | T2]: ...
+
+@overload
+def alt(
+    parser_0: Parser[T1], parser_1: Parser[T2], parser_2: Parser[T3], /
+) -> Parser[T1 | T2 | T3]: ...
+
+@overload
+def alt(
+    parser_0: Parser[T1], parser_1: Parser[T2], parser_2: Parser[T3], parser_3: Parser[T4], /
+) -> Parser[T1 | T2 | T3 | T4]: ...
+
+@overload
+def alt(
+    parser_0: Parser[T1], parser_1: Parser[T2], parser_2: Parser[T3], parser_3: Parser[T4], parser_4: Parser[T5], /
+) -> Parser[T1 | T2 | T3 | T4 | T5]: ...
+
+@overload
+def alt(
+    parser_0: Parser[T1], parser_1: Parser[T2], parser_2: Parser[T3], parser_3: Parser[T4], parser_4: Parser[T5], parser_5: Parser[T6], /,
+) -> Parser[T1 | T2 | T3 | T4 | T5 | T6]: ...
+
+@overload
+def alt(*parsers: Parser[T]) -> Parser[T]: ...
+# fmt: on
+def alt(*parsers: Parser[Any]) -> Parser[Any]:
+    """
+    Try each parser in order, the result is from the first parser which succeeds.
 
-        return Choice((*self_parsers, *other_parsers))
+    This is the same as combining the parsers with ``|``, but builds a single flat
+    ``Choice`` from any number of parsers:
+
+    ```python
+    from parmancer import alt, string
+
+    parser = alt(string("a"), string("b"), string("c"))
+
+    assert parser.parse("b") == "b"
+    ```
+    """
+    # Choices which are not grouped are flattened into their parsers rather than being
+    # nested inside the new Choice
+    flattened: List[Parser[Any]] = []
+    for parser in parsers:
+        if isinstance(parser, Choice) and not parser.is_grouped:
+            flattened.extend(parser.parsers)
+        else:
+            flattened.append(parser)
+    return Choice(tuple(flattened))
 
 
 @dataclass
@@ -1224,6 +1555,146 @@ class Map(Parser[T2], Generic[T1, T2]):
         return result.state.success(self.map_callable(result.value))
 
 
+class _Shortcut(Parser[T_co]):
+    """
+    Base for a subclass of a parser which gets the same result through a shortcut,
+    ``shortcut_result``, skipping some of the parser's steps. States which observe every
+    step (`TextState.observes_steps`) are parsed by the parser's own ``parse_result``.
+    """
+
+    def parse_result(self, state: TextState) -> Result[T_co]:
+        if state.observes_steps:
+            return super().parse_result(state)
+        return self.shortcut_result(state)
+
+    def shortcut_result(self, state: TextState) -> Result[T_co]:
+        raise NotImplementedError
+
+
+@dataclass
+class RegexMap(_Shortcut[T2], Map[Any, T2]):
+    """
+    A `Map` of a `Regex`, such as ``digits.map(int)``, which runs the regex itself so
+    that the regex's own result isn't created only to be mapped and thrown away.
+    """
+
+    def __post_init__(self) -> None:
+        assert isinstance(self.parser, Regex)
+        self.pattern: Pattern[str] = self.parser.pattern
+        self.group_args: Tuple[str | int, ...] = self.parser.group_args
+
+    def shortcut_result(self, state: TextState) -> Result[T2]:
+        match = self.pattern.match(state.text, state.index)
+        if match:
+            value = self.map_callable(match.group(*self.group_args))
+            return state.at(match.end()).success(value)
+        return state.failure(self.parser.name)
+
+
+@dataclass
+class MappedSequence(_Shortcut[T2], Map[Tuple[Any, ...], T2]):
+    """
+    A `Map` of a `Sequence`, such as ``seq(a, b).unpack(fn)``, which runs the sequence's
+    parsers itself and maps their values without creating the sequence's own result.
+    """
+
+    def shortcut_result(self, state: TextState) -> Result[T2]:
+        values: List[Any] = []
+        for parser in cast(Sequence, self.parser).parsers:
+            result = parser.parse_result(state)
+            if not result.status:
+                return result
+            values.append(result.value)
+            state = result.state
+        return state.success(self.map_callable(tuple(values)))
+
+
+@dataclass
+class ComposedMap(_Shortcut[T2], Map[Any, T2]):
+    """
+    A `Map` of a `RegexMap` or `MappedSequence`, such as ``digits.map(int).map(f)``,
+    which runs the inner map once with the two functions composed.
+    """
+
+    def __post_init__(self) -> None:
+        inner = self.parser
+        if isinstance(inner, ComposedMap):
+            inner = inner.fused
+        assert isinstance(inner, (RegexMap, MappedSequence))
+        first_fn = inner.map_callable
+        second_fn = self.map_callable
+        self.fused: _Shortcut[T2] = type(inner)(
+            parser=inner.parser,
+            map_callable=lambda value: second_fn(first_fn(value)),
+            map_name=self.map_name,
+        )
+
+    def shortcut_result(self, state: TextState) -> Result[T2]:
+        return self.fused.shortcut_result(state)
+
+
+# Memoized parsers are told apart in a state's memo by an ID from this counter
+_parser_ids = itertools.count()
+
+
+@dataclass
+class CachedParser(Parser[T]):
+    """
+    A parser whose results are cached for each index of the text being parsed.
+
+    The cache is kept in the state's memo, so results are only shared within one parse.
+    """
+
+    parser: Parser[T]
+
+    def __post_init__(self) -> None:
+        self.name: str = self.parser.name
+        self.parser_id: int = next(_parser_ids)
+
+    def parse_result(self, state: TextState) -> Result[T]:
+        cache = state.memo.get(self.parser_id)
+        if cache is None:
+            cache = state.memo[self.parser_id] = {}
+        cached = cache.get(state.index)
+        if cached is None or cached.state.text is not state.text:
+            # The result is cached without any earlier failures, so that it can be
+            # combined with the failures of whichever state reaches this index
+            cached = self.parser.parse_result(
+                state.with_failures(()) if state.failures else state
+            )
+            cache[state.index] = cached
+        elif state.observes_steps:
+            # The cached result came from the state which first reached this index, so
+            # it's given again through this state's own steps
+            moved = state.at(cached.state.index)
+            if cached.status:
+                rewrapped = moved.success(cached.value)
+            else:
+                rewrapped = moved.failure(cached.failure_info.message)
+            cached = Result(
+                cached.status,
+                rewrapped.state.with_failures(cached.state.failures),
+                cached.failure_info,
+                cached.value,
+            )
+
+        if not state.failures:
+            return cached
+
+        # Keep whichever failures are furthest along, from the current state first and
+        # then from the result, as the parser would if it ran on the current state
+        failures = (*state.failures, *cached.state.failures)
+        furthest_failure = max(info.index for info in failures)
+        return Result(
+            cached.status,
+            cached.state.with_failures(
+                tuple(info for info in failures if info.index == furthest_failure)
+            ),
+            cached.failure_info,
+            cached.value,
+        )
+
+
 @dataclass
 class Gate(Parser[T]):
     name = "Gate condition"
@@ -1239,6 +1710,23 @@ class Gate(Parser[T]):
         return result
 
 
+@dataclass
+class CharGate(_Shortcut[str], Gate[str]):
+    """
+    A `Gate` on a single character, such as ``any_char.gate(str.isalpha)``, which reads
+    the character itself rather than running ``any_char`` first.
+    """
+
+    def shortcut_result(self, state: TextState) -> Result[str]:
+        char = state.text[state.index : state.index + 1]
+        if not char:
+            return state.failure(self.parser.name)
+        next_state = state.at(state.index + 1)
+        if not self.gate_function(char):
+            return next_state.failure(self.name)
+        return next_state.success(char)
+
+
 @dataclass
 class Range(Parser[List[T1]]):
     parser: Parser[T1]
@@ -1254,35 +1742,32 @@ class Range(Parser[List[T1]]):
 
     def parse_result(self, state: TextState) -> Result[List[T1]]:
         start_state = state
-        count = 0
+        parser = self.parser
+        separator = self.separator_parser
         values: List[T1] = []
-        while count < self.max_count:
-            # Separator
-            separator_success = True
-            state_before_separator = state
-            if self.separator_parser is not None and count > 0:
-                sep_result = self.separator_parser.parse_result(state)
-                if sep_result.status:
-                    state = sep_result.state
-                else:
-                    separator_success = False
-            # Parser
-            if separator_success:
-                result = self.parser.parse_result(state)
-                # TODO test that failure aggregation works in this parser
-                if result.status:
+        if self.max_count > 0:
+            result = parser.parse_result(state)
+            if result.status:
+                state = result.state
+                values.append(result.value)
+                # After the first item, every item needs a separator before it
+                while len(values) < self.max_count:
+                    if separator is None:
+                        result = parser.parse_result(state)
+                    else:
+                        sep_result = separator.parse_result(state)
+                        if not sep_result.status:
+                            break
+                        result = parser.parse_result(sep_result.state)
+                    # TODO test that failure aggregation works in this parser
+                    if not result.status:
+                        break
                     state = result.state
                     values.append(result.value)
-                    count += 1
-                    continue
-                else:
-                    state = state_before_separator
 
-            if count >= self.min_count:
-                break
-            else:
-                # Failed and didn't get to min items
-                return state.at(start_state.index).failure(self.name)
+        if len(values) < self.min_count:
+            # Failed and didn't get to min items
+            return state.at(start_state.index).failure(self.name)
 
         return state.success(values)
 
@@ -1329,6 +1814,10 @@ class KeepOne(Parser[T]):
             if not result.status:
                 return result
             state = result.state
+
+        if state is keep_result.state and not state.observes_steps:
+            # The kept parser is in tail position, so its result is reused as it is
+            return keep_result
         return state.success(keep_result.value)
 
     def __rshift__(self: Parser[Any], other: Parser[T_co]) -> Parser[T_co]:
@@ -1433,9 +1922,12 @@ class Sequence(Parser[Tuple[Any, ...]]):
     ``.set_name``.
     """
 
-    def parse_result(self, state: TextState) -> Result[Tuple[Any, ...]]:
+    def __post_init__(self) -> None:
+        # Checked once here rather than every time the sequence is parsed
         if not self.parsers:
             raise ValueError("The Sequence parser requires at least one argument")
+
+    def parse_result(self, state: TextState) -> Result[Tuple[Any, ...]]:
         values: List[Any] = []
         for parser in self.parsers:
             result = parser.parse_result(state)
@@ -1503,6 +1995,25 @@ class Until(Parser[List[T]]):
                 return state.failure(self.name)
 
 
+@dataclass
+class CharsUntil(_Shortcut[List[str]], Until[str]):
+    """
+    `Until` for ``any_char.until(string(literal))``, which finds ``literal`` with a single
+    ``str.find`` rather than trying it at every character.
+    """
+
+    def shortcut_result(self, state: TextState) -> Result[List[str]]:
+        text = state.text
+        index = state.index
+        literal = cast(String, self.until_parser).string
+        # The first position which the loop could stop at, or fail at if it can't stop
+        stop_index = min(index + self.max_count, len(text))
+        end_index = text.find(literal, index + self.min_count)
+        if end_index == -1 or end_index > stop_index:
+            return state.at(int(stop_index)).failure(self.name)
+        return state.at(end_index).success(list(text[index:end_index]))
+
+
 def take(
     parser: Parser[T],
     *,
@@ -1611,18 +2122,34 @@ class DataclassSequence(Parser[DataclassType]):
 
     def __post_init__(self) -> None:
         self.name = f"Data:{self.model.__name__}"
+        # Field names, the parser name while parsing each field, and field parsers
+        self.steps: Tuple[Tuple[str, str, Parser[Any]], ...] = tuple(
+            (name, f"Data:{self.model.__name__}/field:{name}", parser)
+            for name, parser in self.field_parsers.items()
+        )
+        # When the fields are parsed in the same order as the model's ``__init__``
+        # parameters, the values can be passed positionally, which is quicker
+        parameters = [
+            parameter.name
+            for parameter in signature(self.model).parameters.values()
+            if parameter.kind is Parameter.POSITIONAL_OR_KEYWORD
+        ]
+        names = list(self.field_parsers)
+        self.positional: bool = parameters[: len(names)] == names
 
     def parse_result(self, state: TextState) -> Result[DataclassType]:
-        parsed_fields: Dict[str, Any] = {}
-        for name, parser in self.field_parsers.items():
-            self.name = f"Data:{self.model.__name__}/field:{name}"
+        values: List[Any] = []
+        for _, step_name, parser in self.steps:
+            self.name = step_name
             result = parser.parse_result(state)
             if not result.status:
                 return result
             state = result.state
-            parsed_fields[name] = result.value
+            values.append(result.value)
 
-        return state.success(self.model(**parsed_fields))
+        if self.positional:
+            return state.success(self.model(*values))
+        return state.success(self.model(**dict(zip(self.field_parsers, values))))
 
 
 def gather_perm(model: Type[DataclassType]) -> Parser[DataclassType]:
@@ -1657,13 +2184,19 @@ class DataclassPermutation(Parser[DataclassType]):
     def __post_init__(self) -> None:
         self.field_parsers = get_parsers_from_fields(self.model)
         self.name: str = "Dataclass permutation"
+        self.steps: Tuple[Tuple[str, Parser[Any]], ...] = tuple(
+            self.field_parsers.items()
+        )
 
     def parse_result(self, state: TextState) -> Result[DataclassType]:
         parsed_fields: Dict[str, Any] = {}
-        parsers = copy(self.field_parsers)
+        # Bit ``i`` is set while the field of ``self.steps[i]`` hasn't been parsed yet
+        remaining = (1 << len(self.steps)) - 1
         result = None
-        while parsers:
-            for field_name, parser in tuple(parsers.items()):
+        while remaining:
+            for i, (field_name, parser) in enumerate(self.steps):
+                if not remaining & (1 << i):
+                    continue
                 result = parser.parse_result(state)
                 if not result.status:
                     # May pass later in the permutation so don't return yet
@@ -1671,7 +2204,7 @@ class DataclassPermutation(Parser[DataclassType]):
 
                 state = result.state
                 parsed_fields[field_name] = result.value
-                parsers.pop(field_name)
+                remaining &= ~(1 << i)
                 break
             else:
                 # No parsers matched
@@ -1698,9 +2231,8 @@ class EnumMember(Parser[E]):
             key=lambda e: len(str(e.value)),
             reverse=True,
         )
-        self.item_parser = reduce(
-            operator.or_,
-            [string(str(item.value)).result(item) for item in items],
+        self.item_parser = alt(
+            *(string(str(item.value)).result(item) for item in items)
         )
 
     def parse_result(self, state: TextState) -> Result[E]:
@@ -1763,11 +2295,9 @@ def string_from(*strings: str) -> Parser[str]:
     assert parser.parse("cat") == "cat"
     ```
     """
-    return reduce(
-        operator.or_,
-        # Sort longest first, so that overlapping options work correctly
-        (string(s) for s in sorted(strings, key=len, reverse=True)),
-    )
+    # Sort longest first, so that overlapping options work correctly. The Choice skips
+    # the strings which can't match the next character
+    return alt(*(string(s) for s in sorted(strings, key=len, reverse=True)))
 
 
 def char_from(string: str) -> Parser[str]:
@@ -1782,7 +2312,7 @@ def char_from(string: str) -> Parser[str]:
     assert char_from("abc").match("d").status is False
     ```
     """
-    return any_char.gate(lambda c: c in string).set_name(f"[{string}]")
+    return any_char.gate(frozenset(string).__contains__).set_name(f"[{string}]")
 
 
 @dataclass
@@ -1790,14 +2320,22 @@ class ForwardParser(Parser[T]):
     """A forward-defined parser."""
 
     parser_iterator: Callable[[], Iterator[Parser[T]]]
+    parser: Optional[Parser[T]] = field(default=None, init=False, repr=False)
 
     def parse_result(self, state: TextState) -> Result[T]:
-        parser = self.get_parser()
-        result = parser.parse_result(state)
-        return result
+        parser = self.parser
+        if parser is None:
+            parser = self.get_parser()
+        return parser.parse_result(state)
 
     def get_parser(self) -> Parser[T]:
-        return next(self.parser_iterator())
+        """
+        The parser which is referred to. It's only looked up the first time it's
+        needed, after which it's reused rather than running the generator again.
+        """
+        if self.parser is None:
+            self.parser = next(self.parser_iterator())
+        return self.parser
 
 
 def forward_parser(parser_iterator: Callable[[], Iterator[Parser[T]]]) -> Parser[T]:
@@ -0,0 +1,30 @@
+"""`TextState` subclasses which are shared by the tests."""
+
+from dataclasses import dataclass, field
+from typing import Any, ClassVar, List
+
+from parmancer import TextState
+
+
+@dataclass(frozen=True)
+class LabelledState(TextState):
+    """A state with an extra field, which is kept on every state made from it."""
+
+    label: str = "default"
+
+
+@dataclass(frozen=True)
+class RecordingState(TextState):
+    """A state which records the value or failure message of every parser step."""
+
+    observes_steps: ClassVar[bool] = True
+
+    steps: List[Any] = field(default_factory=list)
+
+    def success(self, value: Any) -> Any:
+        self.steps.append(value)
+        return super().success(value)
+
+    def failure(self, message: str) -> Any:
+        self.steps.append(message)
+        return super().failure(message)
@@ -1,7 +1,19 @@
 from dataclasses import dataclass
 
 import pytest
-from parmancer import ParseError, any_char, digit, gather, regex, take, whitespace
+from parmancer import (
+    FailureInfo,
+    ParseError,
+    TextState,
+    any_char,
+    digit,
+    gather,
+    regex,
+    take,
+    whitespace,
+)
+from parmancer.parser import CharGate
+from tests.states import RecordingState
 
 
 def test_gate() -> None:
@@ -50,3 +62,24 @@ def test_gate_can_be_used_for_logic_flow() -> None:
 
     with pytest.raises(ParseError, match="Gate condition"):
         assert parser.parse("bca")
+
+
+def test_gate_on_any_char_failures() -> None:
+    """A gate on a single character fails like any other gate"""
+    parser = any_char.gate(str.isupper)
+    assert isinstance(parser, CharGate)
+
+    failed = parser.parse_result(TextState.start("a"))
+    assert failed.state.failures == (FailureInfo(index=1, message="Gate condition"),)
+
+    at_end = parser.parse_result(TextState.start(""))
+    assert at_end.state.failures == (FailureInfo(index=0, message="Span length 1"),)
+
+
+def test_gate_on_any_char_with_state_subclass() -> None:
+    """States which observe each step still see the character being parsed"""
+
+    state = RecordingState.start("a")
+    result = any_char.gate(str.isupper).parse_result(state)
+    assert not result.status
+    assert state.steps == ["a", "Gate condition"]
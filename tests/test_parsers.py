@@ -1,28 +1,42 @@
 import enum
 import re
-from dataclasses import dataclass
-from typing import Any, Tuple
+import sys
+from dataclasses import FrozenInstanceError, dataclass, replace
+from typing import Any, Iterator, List, Tuple
 
 import pytest
 
 from parmancer import (
     digit,
+    digits,
     letter,
     padding,
     whitespace,
 )
 from parmancer.parser import (
+    Char,
+    CharsUntil,
     Choice,
+    ComposedMap,
     FailureInfo,
+    ForwardParser,
     KeepOne,
+    Map,
+    MappedSequence,
     OneOf,
     ParseError,
     Parser,
+    Regex,
+    RegexMap,
     Result,
     Sequence,
     TextState,
+    Until,
+    _WhitespaceRegex,
+    alt,
     any_char,
     char_from,
+    forward_parser,
     from_enum,
     gather,
     look_ahead,
@@ -35,6 +49,7 @@ from parmancer.parser import (
     success,
     take,
 )
+from tests.states import LabelledState, RecordingState
 
 
 def test_string() -> None:
@@ -48,6 +63,18 @@ def test_string() -> None:
         parser.parse("dog")
 
 
+def test_single_char_string() -> None:
+    parser = string("(")
+    assert isinstance(parser, Char)
+    assert parser.parse("(") == "("
+    assert (string("(") >> string("ab")).parse("(ab") == "ab"
+    result = parser.parse_result(TextState.start(""))
+    assert not result.status
+    assert result.state.failures == (FailureInfo(index=0, message="'('"),)
+    with pytest.raises(ParseError):
+        parser.parse(")")
+
+
 def test_regex_str() -> None:
     parser = regex(r"[0-9]")
 
@@ -64,6 +91,56 @@ def test_regex_compiled() -> None:
         parser.parse("x")
 
 
+def test_regex_patterns_are_shared() -> None:
+    first, second, ascii = (
+        regex(r"\d{2}"),
+        regex(r"\d{2}"),
+        regex(r"\d{2}", flags=re.ASCII),
+    )
+    assert isinstance(first, Regex)
+    assert isinstance(second, Regex)
+    assert isinstance(ascii, Regex)
+    assert first.pattern is second.pattern
+    assert first.pattern is not ascii.pattern
+
+
+def test_compiled_regex_keeps_its_flags() -> None:
+    compiled = re.compile(r"a.b", re.IGNORECASE)
+    parser = regex(compiled, flags=re.DOTALL)
+    assert parser.parse("A\nB") == "A\nB"
+    assert regex(re.compile(r"\w"), flags=re.ASCII).parse("a") == "a"
+    with pytest.raises(ParseError):
+        regex(re.compile(r"\w"), flags=re.ASCII).parse("é")
+
+
+def test_builtin_regex_parsers_are_precompiled() -> None:
+    for parser, name in [
+        (whitespace, r"\s+"),
+        (padding, r"\s*"),
+        (digit, "Digit"),
+        (digits, "Digits"),
+    ]:
+        # Naming a parser doesn't wrap it, so each one matches its compiled pattern
+        # directly
+        assert isinstance(parser, Regex)
+        assert isinstance(parser.pattern, re.Pattern)
+        assert parser.name == name
+
+
+def test_regex_is_compiled_once() -> None:
+    parser = regex(r"[0-9]", flags=re.IGNORECASE)
+    assert isinstance(parser, Regex)
+    assert isinstance(parser.pattern, re.Pattern)
+    assert parser.pattern.flags & re.IGNORECASE
+
+
+def test_regex_group_names_are_resolved() -> None:
+    parser = regex(r"a(?P<first>b)(?P<second>c)", group=("first", 2))
+    assert isinstance(parser, Regex)
+    assert parser.group_args == (1, 2)
+    assert parser.parse("abc") == ("b", "c")
+
+
 def test_regex_group_number() -> None:
     parser = regex(r"a([0-9])b", group=1)
     assert parser.parse("a1b") == "1"
@@ -153,6 +230,29 @@ def test_multiple_shifts_are_flattened() -> None:
     assert parser.right == (d, e)
 
 
+def test_keep_right_reuses_tail_result() -> None:
+    @dataclass
+    class Recorded(Parser[str]):
+        results: List[Result[str]]
+
+        def parse_result(self, state: TextState) -> Result[str]:
+            result = string("b").parse_result(state)
+            self.results.append(result)
+            return result
+
+    recorded = Recorded(results=[])
+    parser = string("a") >> recorded
+
+    result = parser.parse_result(TextState.start("ab"))
+    assert result is recorded.results[0]
+    assert result.value == "b"
+
+    # States which observe each step still get a separate result
+    result = parser.parse_result(RecordingState.start("ab"))
+    assert result is not recorded.results[1]
+    assert result.value == "b"
+
+
 def test_bind() -> None:
     piped = None
 
@@ -175,6 +275,62 @@ def test_map() -> None:
     assert parser.parse("7") == 7
 
 
+def test_map_regex() -> None:
+    pair = regex(r"(\d+)-(\d+)", group=(1, 2))
+    parser = pair.map(lambda values: int(values[0]) + int(values[1]))
+    assert isinstance(parser, RegexMap)
+    assert parser.parse("1-2") == 3
+    assert isinstance(digits.map(int), RegexMap)
+
+    result = digits.map(int).parse_result(TextState.start("a"))
+    assert not result.status
+    assert result.state.failures == (FailureInfo(index=0, message="Digits"),)
+
+    # States which observe each step still see the regex's result
+    state = RecordingState.start("12")
+    assert digits.map(int).parse_result(state).value == 12
+    assert state.steps == ["12", 12]
+
+
+def test_maps_are_fused() -> None:
+    twice = digit.map(int).map(lambda value: value * 2)
+    assert isinstance(twice, ComposedMap)
+    assert isinstance(twice.fused, RegexMap)
+    assert twice.fused.parser is digit
+    assert twice.parse("4") == 8
+
+    summed = seq(digit, digit).map(lambda pair: pair[0] + pair[1])
+    assert isinstance(summed, MappedSequence)
+    assert summed.parse("12") == "12"
+
+    combined = digit.pair(letter).append(letter).unpack(lambda a, b, c: c + b + a)
+    assert isinstance(combined, ComposedMap)
+    assert isinstance(combined.fused, MappedSequence)
+    assert combined.parse("1AB") == "BA1"
+
+    # States which observe each step still see every map and sequence step
+    state = RecordingState.start("4")
+    assert twice.parse_result(state).value == 8
+    assert state.steps == ["4", 4, 8]
+    state = RecordingState.start("1AB")
+    assert combined.parse_result(state).value == "BA1"
+    assert state.steps == [
+        "1",
+        "A",
+        ("1", "A"),
+        "B",
+        (("1", "A"), "B"),
+        ("1", "A", "B"),
+        "BA1",
+    ]
+    unfused = Map(seq(digit, letter, letter), lambda values: "".join(values), "Map")
+    for text in ("1A2", "12"):
+        assert (
+            combined.parse_result(TextState.start(text)).state
+            == unfused.parse_result(TextState.start(text)).state
+        )
+
+
 def test_and() -> None:
     parser = digit & letter
     assert parser.parse("1A") == ("1", "A")
@@ -228,6 +384,24 @@ def test_multiple_failures() -> None:
     )
 
 
+def test_repeated_failures_share_failure_info() -> None:
+    parser = string("a") | string("b")
+
+    first = parser.parse_result(TextState.start("c"))
+    second = parser.parse_result(TextState.start("c"))
+
+    assert first.failure_info == second.failure_info
+    assert all(
+        left is right
+        for left, right in zip(first.state.failures, second.state.failures)
+    )
+
+
+@pytest.mark.skipif(sys.version_info < (3, 10), reason="Dataclass slots need 3.10")
+def test_failure_info_is_slotted() -> None:
+    assert not hasattr(FailureInfo(index=0, message="x"), "__dict__")
+
+
 def test_stateful_parser_early_return() -> None:
     @stateful_parser
     def xy(s: TextState) -> Result[None]:
@@ -279,6 +453,61 @@ def test_nested_ors_are_not_flattened_if_grouped() -> None:
     assert third.parsers == (first, *second.parsers)
 
 
+def test_ors_on_the_right_are_flattened() -> None:
+    first = string("a")
+    second = string("b") | string("c")
+    third = first | second
+    assert isinstance(second, Choice)
+    assert isinstance(third, Choice)
+    assert third.parsers == (first, *second.parsers)
+
+
+def test_choice_skips_literals_without_changing_results() -> None:
+    """
+    Literal parsers which can't match the next character are skipped, but the result
+    and failures are the same as running every parser, which is what happens with a
+    state which observes every step.
+    """
+
+    parser = (
+        string("ab")
+        | string("(") >> digit << string(")")
+        | digit.map(int)
+        | string("x").result("ex")
+        | string("b")
+        | string("").result("empty")
+    )
+    tail = string("!") | string("?").set_name("question")
+    for choice in [parser, tail, string_from("Mr", "Mr.", "Mrs", "Dr")]:
+        for text in ["ab", "(1)", "(x", "7", "x", "b", "c", "", "!", "?", "Mrs", "Dr"]:
+            expected = choice.parse_result(RecordingState.start(text))
+            result = choice.parse_result(TextState.start(text))
+            assert result.status == expected.status
+            assert result.value == expected.value
+            assert result.state.index == expected.state.index
+            assert result.state.failures == expected.state.failures
+
+    failed = tail.parse_result(TextState("a!", 0, (FailureInfo(0, "earlier"),)))
+    assert failed.state.failures == (
+        FailureInfo(0, "earlier"),
+        FailureInfo(0, "'!'"),
+        FailureInfo(0, "question"),
+    )
+
+
+def test_alt() -> None:
+    grouped = (string("a") | string("b")).set_name("Custom name")
+    ungrouped = string("c") | string("d")
+    last = string("e")
+    parser = alt(grouped, ungrouped, last)
+    assert isinstance(ungrouped, Choice)
+    assert isinstance(parser, Choice)
+    assert parser.parsers == (grouped, *ungrouped.parsers, last)
+    assert [parser.parse(x) for x in "abcde"] == ["a", "b", "c", "d", "e"]
+    with pytest.raises(ParseError):
+        parser.parse("f")
+
+
 def test_many() -> None:
     letters = letter.many()
     assert letters.parse("x") == ["x"]
@@ -444,6 +673,23 @@ def test_until_with_min_max() -> None:
     )
 
 
+def test_any_char_until_string() -> None:
+    until = any_char.until(string("x"), min_count=1, max_count=3)
+    assert isinstance(until, CharsUntil)
+    slow = Until(any_char, string("x"), min_count=1, max_count=3)
+
+    for text in ("x", "abx", "xx", "ab", "abcx", "abcdx", ""):
+        state = TextState.start(text)
+        result = until.parse_result(state)
+        expected = slow.parse_result(state)
+        assert result.status == expected.status
+        assert result.value == expected.value
+        assert result.state == expected.state
+
+    assert until.parse_result(TextState.start("abx")).value == ["a", "b"]
+    assert until.parse_result(TextState.start("xx")).state.index == 1
+
+
 def test_optional() -> None:
     p = string("a").optional()
     assert p.parse("a") == "a"
@@ -589,6 +835,11 @@ def test_seq() -> None:
     assert parser.parse("a1b23") == ("a", 1, "b", 2, 3)
 
 
+def test_empty_sequence() -> None:
+    with pytest.raises(ValueError):
+        seq()
+
+
 def test_nested_sequences_are_flattened() -> None:
     first = string("a") & string("b")
     second = string("c") & string("d")
@@ -649,6 +900,17 @@ def test_add_custom_addable_types() -> None:
     assert parser_backwards.parse("1 2") == B(21)
 
 
+def test_gather_field_order() -> None:
+    @dataclass
+    class Pair:
+        first: str = take(letter)
+        second: int = take(digit.map(int))
+        untaken: str = "default"
+
+    assert gather(Pair).parse("a1") == Pair("a", 1)
+    assert gather(Pair, field_order=["second", "first"]).parse("1a") == Pair("a", 1)
+
+
 def test_char_from_str() -> None:
     ab = char_from("ab")
     assert ab.parse("a") == "a"
@@ -656,6 +918,11 @@ def test_char_from_str() -> None:
 
     with pytest.raises(ParseError, match=re.escape("[ab]")):
         ab.parse("x")
+    greek = char_from("αβγ")
+    assert greek.parse("β") == "β"
+    assert greek.many().concat().parse("γαβ") == "γαβ"
+    with pytest.raises(ParseError, match=re.escape("[αβγ]")):
+        greek.parse("a")
 
 
 def test_string_from() -> None:
@@ -670,6 +937,19 @@ def test_string_from() -> None:
         titles.parse("foo")
 
 
+def test_string_from_matches_like_trying_each_string() -> None:
+    words = string_from("in", "int", "is", "", "in", "iter")
+    assert words.parse("int") == "int"
+    assert words.parse_result(TextState.start("inte")).value == "int"
+    assert words.parse_result(TextState.start("iz")).value == ""
+    # Near the end of the text, shorter slices don't match the longer strings
+    assert (string("x") >> words).parse("xin") == "in"
+
+    result = string_from("ab", "a").parse_result(TextState.start("a"))
+    assert result.value == "a"
+    assert result.state.failures == (FailureInfo(index=0, message="'ab'"),)
+
+
 def test_concat_list_of_str() -> None:
     parser = string_from("a", "b").many().concat()
     assert parser.parse("aabba") == "aabba"
@@ -743,14 +1023,188 @@ def test_concat_list_of_lists() -> None:
 
 
 def test_look_ahead() -> None:
-    result = look_ahead(any_char).parse_result(TextState.start("abc"))
+    state = TextState.start("abc")
+    result = look_ahead(any_char).parse_result(state)
     assert result.value == "a"
     assert result.state.remaining() == "abc"
+    # The original state is handed back rather than a copy at the same index
+    assert result.state is state
 
     with pytest.raises(ParseError, match="'Digit'"):
         look_ahead(digit).parse("a")
 
 
+def test_state_progress_keeps_extra_fields() -> None:
+    state = LabelledState("abc", 0, label="custom")
+    moved = state.at(2)
+    assert isinstance(moved, LabelledState)
+    assert moved.index == 2
+    assert moved.label == "custom"
+    assert string("ab").parse("ab", state_handler=LabelledState) == "ab"
+
+
+def test_state_progress_makes_equal_frozen_states() -> None:
+    failures = (FailureInfo(index=1, message="x"),)
+    moved = TextState.start("abc").progress(2, failures)
+    assert type(moved) is TextState
+    assert moved == TextState("abc", 2, failures)
+    assert hash(moved) == hash(TextState("abc", 2, failures))
+    with pytest.raises(FrozenInstanceError):
+        moved.index = 0  # type: ignore[misc]
+
+
+def test_state_at_same_index_is_reused() -> None:
+    state = TextState.start("abc")
+    assert state.at(0) is state
+
+
+def test_memoize() -> None:
+    calls = 0
+
+    def count_calls(value: str) -> str:
+        nonlocal calls
+        calls += 1
+        return value
+
+    item = regex(r"\w+").map(count_calls).memoize()
+    parser = item << string("!") | item << string("?") | item
+    assert parser.parse("abc?") == "abc"
+    assert calls == 1
+
+    # Each parse has its own cache, even when parsing the same text again
+    assert parser.parse("abc") == "abc"
+    assert calls == 2
+    assert parser.parse("abc") == "abc"
+    assert calls == 3
+
+
+def test_memoize_keeps_failures() -> None:
+    item = regex(r"\w+").memoize()
+    parser = item << string("!") | item << string("?")
+    with pytest.raises(ParseError) as error:
+        parser.parse("abc.")
+    assert error.value.failures == (
+        FailureInfo(index=3, message="'!'"),
+        FailureInfo(index=3, message="'?'"),
+    )
+
+
+def test_memoize_cache_is_not_shared_between_parses() -> None:
+    item = regex("[a-z]+").memoize()
+    first = string("x") | item
+    second = item | string("y")
+
+    for _ in range(2):
+        with pytest.raises(ParseError) as error:
+            first.parse("123")
+        assert error.value.failures == (
+            FailureInfo(index=0, message="'x'"),
+            FailureInfo(index=0, message="[a-z]+"),
+        )
+
+        with pytest.raises(ParseError) as error:
+            second.parse("123")
+        assert error.value.failures == (
+            FailureInfo(index=0, message="[a-z]+"),
+            FailureInfo(index=0, message="'y'"),
+        )
+
+    # Results are kept in the memo of the states from one parse
+    state = TextState.start("abc")
+    assert item.parse_result(state).state.memo is state.memo
+    assert state.memo
+    assert not TextState.start("abc").memo
+
+
+def test_memoize_with_other_states() -> None:
+    number = regex(r"\d+").map(int).memoize()
+    state = TextState.start("12")
+    assert number.parse_result(state).value == 12
+    # A state made with `replace` doesn't share the memo of the state it's made from
+    assert number.parse_result(replace(state, text="99")).value == 99
+
+    labelled = LabelledState("12", 0, (), "custom")
+    assert labelled.label == "custom"
+    result = number.parse_result(labelled)
+    assert isinstance(result.state, LabelledState)
+    assert result.state.label == "custom"
+
+    # On a cache hit, states which observe steps see the result through their own state
+    first = RecordingState.start("12")
+    parser = number << string("!") | number
+    result = parser.parse_result(first)
+    assert result.value == 12
+    assert isinstance(result.state, RecordingState)
+    assert first.steps.count(12) == 2
+
+
+def test_memoize_reuses_result_without_failures_to_merge() -> None:
+    item = regex(r"\w+").memoize()
+    state = TextState.start("abc")
+    first = item.parse_result(state)
+    assert item.parse_result(state) is first
+
+    failed = state.failure("other").state
+    merged = item.parse_result(failed)
+    assert merged is not first
+    assert merged.value == "abc"
+    assert merged.state.failures == (FailureInfo(index=0, message="other"),)
+
+
+def test_memoize_merges_failures_like_the_parser() -> None:
+    words = regex(r"\w+") << string("!") | regex(r"\w+") << string("?")
+    memoized = words.memoize()
+    state = TextState.start("abc.")
+    earlier = state.failure("earlier").state
+    later = state.at(3).failure("later").state.at(0)
+
+    # The first call fills the cache; the others reuse it with different failures
+    for incoming in (later, state, earlier, later):
+        result = memoized.parse_result(incoming)
+        expected = words.parse_result(incoming)
+        assert result.status == expected.status
+        assert result.state == expected.state
+        assert result.state.failures == expected.state.failures
+
+
+def test_forward_parser_is_resolved_once() -> None:
+    lookups = 0
+
+    @forward_parser
+    def _parser() -> Iterator[Parser[str]]:
+        nonlocal lookups
+        lookups += 1
+        yield parser
+
+    parser = string("a") | string("(") >> _parser << string(")")
+    assert parser.parse("(((a)))") == "a"
+    assert parser.parse("((a))") == "a"
+    assert lookups == 1
+    assert isinstance(_parser, ForwardParser)
+    assert _parser.parser is parser
+
+
+def test_recursive_parser_nests_flat_combinators() -> None:
+    @forward_parser
+    def _parser() -> Iterator[Parser[str]]:
+        yield parser
+
+    open_bracket = string("(")
+    close_bracket = string(")")
+    parser = string("a") | open_bracket >> _parser << close_bracket
+
+    # Each level of brackets only goes through one Choice and one KeepOne
+    assert isinstance(parser, Choice)
+    bracketed = parser.parsers[1]
+    assert isinstance(bracketed, KeepOne)
+    assert bracketed.left == (open_bracket,)
+    assert bracketed.keep is _parser
+    assert bracketed.right == (close_bracket,)
+
+    depth = 300
+    assert parser.parse("(" * depth + "a" + ")" * depth) == "a"
+
+
 def test_any_char() -> None:
     assert any_char.parse("x") == "x"
     assert any_char.parse("\n") == "\n"
@@ -765,6 +1219,29 @@ def test_whitespace() -> None:
         whitespace.parse("x")
 
 
+def test_padding() -> None:
+    assert padding.parse(" \t\n") == " \t\n"
+    assert padding.parse("") == ""
+    assert (padding >> string("x")).parse("x") == "x"
+    assert (padding >> string("x")).parse("  x") == "x"
+
+
+def test_whitespace_regex() -> None:
+    # Whitespace patterns check for whitespace before running the regex
+    for parser in (regex(r"\s*"), regex(r"\s+"), padding, whitespace):
+        assert isinstance(parser, _WhitespaceRegex)
+    assert (regex(r"\s*") + string("x")).parse("\t x") == "\t x"
+    assert (regex(r"\s*") + string("x")).parse("x") == "x"
+    assert (regex(r"\s+") + string("x")).parse(" \nx") == " \nx"
+
+    failed = regex(r"\s+").parse_result(TextState.start("x"))
+    assert failed.state.failures == (FailureInfo(index=0, message=r"\s+"),)
+
+    ascii_padding = regex(r"\s*", flags=re.ASCII)
+    assert ascii_padding.parse_result(TextState.start("\u00a0")).state.index == 0
+    assert padding.parse("\u00a0") == "\u00a0"
+
+
 def test_letter() -> None:
     assert letter.parse("a") == "a"
     with pytest.raises(ParseError):